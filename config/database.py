@@ -1,36 +1,178 @@
 from flask_pymongo import PyMongo
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 import os
 import sys
+import threading
+from config.logging_config import get_logger
+from config.metrics import METRICS_ENABLED, command_metrics
 
-# Variable global para la conexión
+logger = get_logger(__name__)
+
+# Variable global para la conexión (un cliente por proceso)
 mongo = None
+_mongo_pid = None
+_mongo_lock = threading.Lock()
+
+def _env_int(name, default):
+    """Leer un entero desde variables de entorno"""
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning('⚠️ Valor inválido para %s: %s, usando %s', name, value, default)
+        return default
+
+def get_pool_options():
+    """Opciones del pool de conexiones desde variables de entorno"""
+    return {
+        'maxPoolSize': _env_int('MONGODB_MAX_POOL_SIZE', 50),
+        'minPoolSize': _env_int('MONGODB_MIN_POOL_SIZE', 0),
+        'maxIdleTimeMS': _env_int('MONGODB_MAX_IDLE_TIME_MS', 60000),
+        'waitQueueTimeoutMS': _env_int('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 5000),
+        'connectTimeoutMS': _env_int('MONGODB_CONNECT_TIMEOUT_MS', 10000),
+        'socketTimeoutMS': _env_int('MONGODB_SOCKET_TIMEOUT_MS', 30000),
+        'serverSelectionTimeoutMS': _env_int('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 10000)
+    }
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Contadores del pool de conexiones de MongoDB"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.created = 0
+            self.closed = 0
+            self.checked_out = 0
+            self.checked_in = 0
+            self.checkout_failed = 0
+            self.pools_cleared = 0
+
+    def _inc(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._inc('pools_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._inc('created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._inc('closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._inc('checkout_failed')
+
+    def connection_checked_out(self, event):
+        self._inc('checked_out')
+
+    def connection_checked_in(self, event):
+        self._inc('checked_in')
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'connections_created': self.created,
+                'connections_closed': self.closed,
+                'connections_open': self.created - self.closed,
+                'connections_in_use': self.checked_out - self.checked_in,
+                'checkouts': self.checked_out,
+                'checkout_failures': self.checkout_failed,
+                'pools_cleared': self.pools_cleared
+            }
+
+pool_stats = PoolStatsListener()
+
+def get_client():
+    """Obtener el cliente de MongoDB del proceso actual (se crea una sola vez)"""
+    global mongo, _mongo_pid
+
+    pid = os.getpid()
+    if mongo is not None and _mongo_pid == pid:
+        return mongo
+
+    with _mongo_lock:
+        if mongo is None or _mongo_pid != pid:
+            # Tras un fork (gunicorn) el cliente heredado no es seguro: crear uno nuevo
+            mongodb_uri = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/video-segments-player')
+            pool_stats.reset()
+            listeners = [pool_stats, command_metrics] if METRICS_ENABLED else [pool_stats]
+            mongo = MongoClient(mongodb_uri, event_listeners=listeners, **get_pool_options())
+            _mongo_pid = pid
+    return mongo
+
+def reset_client():
+    """Descartar el cliente actual (usar después de un fork o al apagar)"""
+    global mongo, _mongo_pid
+
+    with _mongo_lock:
+        client = mongo
+        mongo = None
+        _mongo_pid = None
+    if client is not None:
+        try:
+            client.close()
+        except Exception as error:
+            logger.warning('⚠️ Error al cerrar cliente de MongoDB: %s', error)
+
+def _forget_client_after_fork():
+    """En el proceso hijo no se cierra el cliente heredado, solo se olvida"""
+    global mongo, _mongo_pid, _mongo_lock
+    mongo = None
+    _mongo_pid = None
+    _mongo_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_client_after_fork)
 
 def connect_db():
     """Conectar a MongoDB"""
-    global mongo
-    
     try:
-        # Obtener URI de MongoDB desde variables de entorno
-        mongodb_uri = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/video-segments-player')
-        
-        # Crear cliente de MongoDB
-        client = MongoClient(mongodb_uri)
-        
+        # Obtener cliente compartido del proceso
+        client = get_client()
+
         # Verificar conexión
         client.admin.command('ping')
-        
-        print(f"✅ MongoDB conectado: {client.address[0]}:{client.address[1]}")
-        
+
+        logger.info('✅ MongoDB conectado: %s:%s', client.address[0], client.address[1])
+
         # Retornar cliente para usar en la aplicación
         return client
-        
+
     except Exception as error:
-        print(f'❌ Error al conectar a MongoDB: {error}')
+        logger.error('❌ Error al conectar a MongoDB: %s', error)
         sys.exit(1)
 
 def get_db():
     """Obtener instancia de la base de datos"""
-    client = connect_db()
+    client = get_client()
     db_name = os.environ.get('MONGODB_DB', 'video-segments-player')
-    return client[db_name] 
\ No newline at end of file
+    return client[db_name]
+
+def get_pool_stats():
+    """Estadísticas del pool de conexiones del proceso actual"""
+    stats = pool_stats.snapshot()
+    stats['pid'] = os.getpid()
+    stats['client_initialized'] = mongo is not None and _mongo_pid == os.getpid()
+    stats['options'] = get_pool_options()
+    return stats
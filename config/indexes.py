@@ -0,0 +1,63 @@
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Registro de índices por colección: (nombre, claves, opciones)
+INDEXES = {
+    'users': [
+        ('email_unique', [('email', ASCENDING)], {'unique': True}),
+        ('username_unique', [('username', ASCENDING)], {'unique': True})
+    ],
+    'projects': [],
+    'segments': [
+        # Sirve tanto la lista por proyecto como la consulta por ventana de tiempo (?from=&to=)
+        ('projectid_startTime_endTime', [('projectid', ASCENDING), ('startTime', ASCENDING), ('endTime', ASCENDING)], {})
+    ]
+}
+
+def register_index(collection, name, keys, **options):
+    """Declarar un índice adicional para una colección"""
+    INDEXES.setdefault(collection, [])
+    INDEXES[collection] = [index for index in INDEXES[collection] if index[0] != name]
+    INDEXES[collection].append((name, keys, options))
+
+def ensure_indexes(db):
+    """Crear los índices declarados que falten (create_index es idempotente)"""
+    results = {}
+    for collection, indexes in INDEXES.items():
+        for name, keys, options in indexes:
+            try:
+                db[collection].create_index(keys, name=name, **options)
+                results[f'{collection}.{name}'] = 'ok'
+                logger.info('✅ Índice asegurado: %s.%s', collection, name)
+            except OperationFailure as error:
+                results[f'{collection}.{name}'] = f'error: {error}'
+                logger.warning('❌ No se pudo crear el índice %s.%s: %s', collection, name, error)
+    return results
+
+def _index_usage(collection):
+    """Cantidad de operaciones por índice desde el último reinicio del servidor"""
+    try:
+        return {
+            stats['name']: stats['accesses']['ops']
+            for stats in collection.aggregate([{'$indexStats': {}}])
+        }
+    except OperationFailure:
+        # $indexStats no está disponible en todos los planes de Atlas
+        return {}
+
+def report_indexes(db):
+    """Reportar índices declarados que faltan, no declarados y sin uso"""
+    report = {}
+    for collection, indexes in INDEXES.items():
+        existing = db[collection].index_information()
+        declared = {name for name, _, _ in indexes}
+        usage = _index_usage(db[collection])
+        report[collection] = {
+            'missing': sorted(declared - set(existing)),
+            'undeclared': sorted(set(existing) - declared - {'_id_'}),
+            'unused': sorted(name for name, ops in usage.items() if ops == 0 and name != '_id_')
+        }
+    return report
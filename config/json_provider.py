@@ -0,0 +1,80 @@
+import json
+import os
+from datetime import date, datetime
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# orjson es opcional: si no está instalado se usa el módulo json estándar
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    """Tipos que ninguno de los codificadores conoce: ObjectId y fechas en ISO 8601"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask: orjson si está disponible, si no json estándar
+
+    La salida es compacta y sin ordenar claves; ObjectId y datetime se codifican
+    directamente (los modelos ya no los convierten en to_response_dict).
+    Con JSON_PRETTY=true se indenta la salida (útil en desarrollo).
+    """
+
+    default = staticmethod(_default)
+    sort_keys = False
+    ensure_ascii = False
+    compact = True
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.compact = os.environ.get('JSON_PRETTY', 'false').lower() != 'true'
+        self.backend = os.environ.get('JSON_BACKEND', 'orjson' if orjson else 'json')
+        if self.backend == 'orjson' and orjson is None:
+            logger.warning('⚠️ orjson no está instalado, usando json estándar')
+            self.backend = 'json'
+        self._orjson_options = 0
+        if orjson is not None:
+            self._orjson_options = orjson.OPT_NON_STR_KEYS
+            if not self.compact:
+                self._orjson_options |= orjson.OPT_INDENT_2
+
+    def _dumps_bytes(self, obj):
+        if self.backend == 'orjson':
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options)
+        return self._dumps_str(obj).encode('utf-8')
+
+    def _dumps_str(self, obj):
+        if self.compact:
+            return json.dumps(obj, default=self.default, ensure_ascii=self.ensure_ascii, separators=(',', ':'))
+        return json.dumps(obj, default=self.default, ensure_ascii=self.ensure_ascii, indent=2)
+
+    def dumps(self, obj, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return self._dumps_bytes(obj).decode('utf-8')
+        if kwargs:
+            kwargs.setdefault('default', self.default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            return json.dumps(obj, **kwargs)
+        return self._dumps_str(obj)
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Igual que jsonify pero codificando directamente a bytes"""
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._dumps_bytes(obj)
+        if not self.compact:
+            body += b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -1,16 +1,24 @@
 import jwt
 import os
+import time
+import hashlib
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, current_app
 from models.user import User
 from config.database import get_db
+from utils.cache import TTLCache
 
 # Configuración JWT
 JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24  # Token válido por 24 horas
 
+# Caché de tokens verificados -> usuario (nunca dura más que el 'exp' del token)
+JWT_USER_CACHE_SIZE = int(os.environ.get('JWT_USER_CACHE_SIZE', 1024))
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', 300))
+_user_cache = TTLCache(maxsize=JWT_USER_CACHE_SIZE, ttl=JWT_USER_CACHE_TTL)
+
 def generate_token(user_id, username, email):
     """Generar token JWT para un usuario"""
     payload = {
@@ -33,16 +41,55 @@ def verify_token(token):
     except jwt.InvalidTokenError:
         return None
 
+def _token_key(token):
+    """Clave de caché: hash del token (no se guarda el token en claro)"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def _get_request_token():
+    """Obtener token del header Authorization"""
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
+
+def resolve_token_user(token):
+    """Obtener el usuario de un token, usando la caché de tokens verificados
+
+    Retorna (usuario, mensaje_de_error).
+    """
+    key = _token_key(token)
+    user = _user_cache.get(key)
+    if user is not None:
+        return user, None
+    
+    payload = verify_token(token)
+    if not payload:
+        return None, 'Token inválido o expirado'
+    
+    db = get_db()
+    user = User.find_by_email(db, payload['email'])
+    if not user:
+        return None, 'Usuario no encontrado'
+    
+    _user_cache.set(key, user, ttl=payload['exp'] - time.time())
+    return user, None
+
+def invalidate_user_cache(user_id=None, email=None):
+    """Eliminar de la caché los tokens de un usuario (al guardar el usuario)"""
+    return _user_cache.delete_where(
+        lambda user: (user_id is not None and user._id == user_id) or (email is not None and user.email == email)
+    )
+
+def get_user_cache_stats():
+    """Métricas de la caché de tokens"""
+    return _user_cache.stats()
+
 def token_required(f):
     """Decorador para proteger rutas que requieren autenticación"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
         # Obtener token del header Authorization
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
+        token = _get_request_token()
         
         if not token:
             return jsonify({
@@ -51,22 +98,13 @@ def token_required(f):
             }), 401
         
         try:
-            # Verificar token
-            payload = verify_token(token)
-            if not payload:
-                return jsonify({
-                    'success': False,
-                    'message': 'Token inválido o expirado'
-                }), 401
-            
-            # Obtener usuario de la base de datos
-            db = get_db()
-            user = User.find_by_email(db, payload['email'])
+            # Verificar token y obtener usuario (caché o base de datos)
+            user, error_message = resolve_token_user(token)
             
             if not user:
                 return jsonify({
                     'success': False,
-                    'message': 'Usuario no encontrado'
+                    'message': error_message
                 }), 401
             
             # Agregar usuario al request
@@ -84,16 +122,9 @@ def token_required(f):
 
 def get_current_user():
     """Obtener usuario actual desde el token"""
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
+    token = _get_request_token()
+    if not token:
         return None
     
-    token = auth_header.split(' ')[1]
-    payload = verify_token(token)
-    
-    if not payload:
-        return None
-    
-    db = get_db()
-    user = User.find_by_email(db, payload['email'])
+    user, _ = resolve_token_user(token)
     return user 
\ No newline at end of file
@@ -0,0 +1,167 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import reprlib
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Configuración de logging
+LOGGER_NAME = 'app'
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'info').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+LOG_PAYLOAD_MAX_CHARS = int(os.environ.get('LOG_PAYLOAD_MAX_CHARS', 500))
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+# Tasas por endpoint, ej: "segments.increment_views_route=0.01,projects.get_projects_route=0.1"
+LOG_SAMPLE_ROUTES = os.environ.get('LOG_SAMPLE_ROUTES', '')
+
+_listener = None
+_setup_lock = threading.Lock()
+_queue_handler = None
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler que descarta registros si la cola está llena en lugar de bloquear"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class RequestSamplingFilter(logging.Filter):
+    """Descartar registros informativos de peticiones no muestreadas"""
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        try:
+            from flask import g, has_request_context
+            if has_request_context():
+                return g.get('log_sampled', True)
+        except ImportError:
+            pass
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Formato JSON de una línea por registro"""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+def _build_formatter():
+    if LOG_FORMAT == 'json':
+        return JsonFormatter()
+    return logging.Formatter('%(asctime)s %(levelname)s %(name)s - %(message)s')
+
+def _start_listener(log_queue):
+    global _listener
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_build_formatter())
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+def _restart_after_fork():
+    """El hilo del listener no sobrevive al fork (gunicorn): crear cola e hilo nuevos"""
+    global _setup_lock
+    _setup_lock = threading.Lock()
+    if _queue_handler is not None:
+        _queue_handler.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _start_listener(_queue_handler.queue)
+
+def setup_logging():
+    """Configurar el logger de la aplicación con un handler en segundo plano"""
+    global _queue_handler
+
+    logger = logging.getLogger(LOGGER_NAME)
+    if _queue_handler is not None:
+        return logger
+
+    with _setup_lock:
+        if _queue_handler is None:
+            log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+            handler = NonBlockingQueueHandler(log_queue)
+            handler.addFilter(RequestSamplingFilter())
+            logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+            logger.addHandler(handler)
+            logger.propagate = False
+            _start_listener(log_queue)
+            atexit.register(_stop_listener)
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=_restart_after_fork)
+            _queue_handler = handler
+    return logger
+
+def get_logger(name):
+    """Obtener un logger hijo del logger de la aplicación"""
+    setup_logging()
+    return logging.getLogger(f'{LOGGER_NAME}.{name}')
+
+def _parse_sample_routes(value):
+    rates = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        endpoint, rate = item.split('=', 1)
+        try:
+            rates[endpoint.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+_sample_rates = _parse_sample_routes(LOG_SAMPLE_ROUTES)
+
+def should_sample(endpoint):
+    """Decidir si se registran los logs informativos de una petición a este endpoint"""
+    rate = _sample_rates.get(endpoint, LOG_SAMPLE_RATE)
+    return rate >= 1 or random.random() < rate
+
+_summary_repr = reprlib.Repr()
+_summary_repr.maxlevel = 3
+_summary_repr.maxdict = 10
+_summary_repr.maxlist = 5
+_summary_repr.maxstring = 80
+_summary_repr.maxother = 80
+
+class summarize:
+    """Resumen de tamaño acotado de un payload, calculado solo si el registro se emite"""
+
+    __slots__ = ('payload', 'limit')
+
+    def __init__(self, payload, limit=None):
+        self.payload = payload
+        self.limit = limit or LOG_PAYLOAD_MAX_CHARS
+
+    def __str__(self):
+        text = _summary_repr.repr(self.payload)
+        if len(text) > self.limit:
+            return text[:self.limit] + '...'
+        return text
+
+def get_logging_stats():
+    """Estadísticas del handler de logging"""
+    if _queue_handler is None:
+        return {'queued': 0, 'dropped': 0}
+    return {
+        'queued': _queue_handler.queue.qsize(),
+        'dropped': _queue_handler.dropped
+    }
@@ -0,0 +1,135 @@
+import bisect
+import os
+import threading
+from pymongo import monitoring
+
+# Métricas en memoria por proceso, expuestas en /metrics con formato de texto de Prometheus
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=''):
+    labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    if extra:
+        labels = f'{labels},{extra}' if labels else extra
+    return f'{{{labels}}}' if labels else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Contador con etiquetas"""
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values=(), amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(values.items()):
+            lines.append(f'{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}')
+        return lines
+
+class Histogram:
+    """Histograma con etiquetas y buckets fijos (en segundos)"""
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        # Solo se guarda el bucket exacto; los acumulados se calculan al exportar
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self):
+        with self._lock:
+            snapshot = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, label_values, le)} {cumulative}')
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+# Peticiones HTTP por endpoint del blueprint (no por URL, para acotar las etiquetas)
+http_requests = Counter(
+    'http_requests_total', 'Peticiones HTTP atendidas', ('endpoint', 'method', 'status')
+)
+http_request_duration = Histogram(
+    'http_request_duration_seconds', 'Duración de las peticiones HTTP', ('endpoint', 'method')
+)
+
+# Comandos de MongoDB (find, insert, update, aggregate, ...)
+mongo_commands = Counter(
+    'mongodb_commands_total', 'Comandos enviados a MongoDB', ('command', 'status')
+)
+mongo_command_duration = Histogram(
+    'mongodb_command_duration_seconds', 'Duración de los comandos de MongoDB', ('command',)
+)
+
+def observe_request(endpoint, method, status, duration):
+    """Registrar una petición atendida"""
+    endpoint = endpoint or 'unmatched'
+    http_requests.inc((endpoint, method, str(status)))
+    http_request_duration.observe((endpoint, method), duration)
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Cantidad y duración de los comandos de MongoDB (la duración viene en el evento)"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_commands.inc((event.command_name, 'success'))
+        mongo_command_duration.observe((event.command_name,), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        mongo_commands.inc((event.command_name, 'failure'))
+        mongo_command_duration.observe((event.command_name,), event.duration_micros / 1e6)
+
+command_metrics = CommandMetricsListener()
+
+def _sample_lines(name, documentation, metric_type, samples):
+    """Líneas de una métrica leída de otras estadísticas a partir de [(etiquetas, valor)]"""
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} {metric_type}']
+    for labels, value in samples:
+        lines.append(f'{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}')
+    return lines
+
+def render_metrics(extra=()):
+    """Texto de Prometheus: contadores, histogramas y extra [(nombre, descripción, tipo, muestras)]"""
+    lines = []
+    for metric in (http_requests, http_request_duration, mongo_commands, mongo_command_duration):
+        lines.extend(metric.collect())
+    for name, documentation, metric_type, samples in extra:
+        lines.extend(_sample_lines(name, documentation, metric_type, samples))
+    return '\n'.join(lines) + '\n'
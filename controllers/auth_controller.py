@@ -2,6 +2,9 @@ from flask import request, jsonify
 from models.user import User
 from config.database import get_db
 from config.jwt_config import generate_token, token_required, get_current_user
+from config.logging_config import get_logger, summarize
+
+logger = get_logger(__name__)
 
 def login():
     """Iniciar sesión de usuario"""
@@ -10,8 +13,8 @@ def login():
         email = data.get('email')
         password = data.get('password')
         
-        print('🔐 Intento de login iniciado')
-        print('📝 Datos recibidos:', {'email': email, 'password': '***' if password else 'undefined'})
+        logger.debug('🔐 Intento de login iniciado')
+        logger.debug('📝 Datos recibidos: %s', summarize({'email': email, 'password': '***' if password else 'undefined'}))
 
         # Validar datos requeridos
         if not email or not password:
@@ -22,49 +25,42 @@ def login():
 
         # Obtener base de datos
         db = get_db()
-        print(f'🗄️ Base de datos: {db.name}')
-        print(f'📊 Colección users: {db.users.name}')
+        logger.debug('🗄️ Base de datos: %s', db.name)
+        logger.debug('📊 Colección users: %s', db.users.name)
         
         # Buscar usuario por email
-        print('🔍 Buscando usuario con email:', email)
+        logger.debug('🔍 Buscando usuario con email: %s', email)
         user = User.find_by_email(db, email)
         
         if not user:
-            print('❌ Usuario no encontrado:', email)
+            logger.warning('❌ Usuario no encontrado: %s', email)
             return jsonify({
                 'success': False,
                 'message': 'Credenciales inválidas'
             }), 401
 
-        print('✅ Usuario encontrado:', {
+        logger.info('✅ Usuario encontrado: %s', summarize({
             '_id': str(user._id),
             'username': user.username,
             'email': user.email,
             'passwordStored': '***' if user.password else 'undefined'
-        })
+        }))
 
         # Verificar contraseña sin encriptar
-        print('🔐 Verificando contraseña...')
-        print('📝 Contraseña recibida:', password)
-        print('📝 Contraseña almacenada:', user.password)
+        logger.debug('🔐 Verificando contraseña...')
         
         if user.password != password:
-            print('❌ Contraseña incorrecta')
-            print('🔍 Comparación:', {
-                'received': password,
-                'stored': user.password,
-                'match': user.password == password
-            })
+            logger.warning('❌ Contraseña incorrecta')
             return jsonify({
                 'success': False,
                 'message': 'Credenciales inválidas'
             }), 401
 
-        print('✅ Contraseña correcta - Login exitoso')
+        logger.info('✅ Contraseña correcta - Login exitoso')
 
         # Generar token JWT
         token = generate_token(user._id, user.username, user.email)
-        print('🎫 Token JWT generado')
+        logger.debug('🎫 Token JWT generado')
 
         # Respuesta exitosa con token
         response = {
@@ -76,11 +72,11 @@ def login():
             }
         }
 
-        print('📤 Enviando respuesta exitosa con token')
+        logger.debug('📤 Enviando respuesta exitosa con token')
         return jsonify(response)
 
     except Exception as error:
-        print('💥 Error en login:', str(error))
+        logger.error('💥 Error en login: %s', error, exc_info=True)
         return jsonify({
             'success': False,
             'message': 'Error al iniciar sesión'
@@ -106,7 +102,7 @@ def verify_auth():
         })
         
     except Exception as error:
-        print('💥 Error en verificación de autenticación:', str(error))
+        logger.error('💥 Error en verificación de autenticación: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al verificar autenticación'
@@ -127,12 +123,12 @@ def register():
         email = data.get('email')
         password = data.get('password')
         
-        print('📝 Intento de registro iniciado')
-        print('📋 Datos recibidos:', {
+        logger.debug('📝 Intento de registro iniciado')
+        logger.debug('📋 Datos recibidos: %s', summarize({
             'username': username, 
             'email': email, 
             'password': '***' if password else 'undefined'
-        })
+        }))
 
         # Validar datos requeridos
         if not username or not email or not password:
@@ -145,37 +141,37 @@ def register():
         db = get_db()
 
         # Verificar si el usuario ya existe
-        print('🔍 Verificando si username ya existe:', username)
+        logger.debug('🔍 Verificando si username ya existe: %s', username)
         existing_user = User.find_by_username(db, username)
         if existing_user:
-            print('❌ Usuario ya existe:', username)
+            logger.warning('❌ Usuario ya existe: %s', username)
             return jsonify({
                 'success': False,
                 'message': 'El username ya está registrado'
             }), 400
 
         # Verificar si el email ya existe
-        print('🔍 Verificando si email ya existe:', email)
+        logger.debug('🔍 Verificando si email ya existe: %s', email)
         existing_email = User.find_by_email(db, email)
         if existing_email:
-            print('❌ Email ya existe:', email)
+            logger.warning('❌ Email ya existe: %s', email)
             return jsonify({
                 'success': False,
                 'message': 'El email ya está registrado'
             }), 400
 
-        print('✅ Usuario y email disponibles, creando nuevo usuario')
+        logger.info('✅ Usuario y email disponibles, creando nuevo usuario')
 
         # Crear nuevo usuario
         user = User(username=username, email=email, password=password)
 
-        print('💾 Guardando usuario en la base de datos...')
+        logger.debug('💾 Guardando usuario en la base de datos...')
         user.save(db)
-        print('✅ Usuario guardado exitosamente:', {
+        logger.info('✅ Usuario guardado exitosamente: %s', summarize({
             '_id': str(user._id),
             'username': user.username,
             'email': user.email
-        })
+        }))
 
         # Respuesta exitosa
         response = {
@@ -186,11 +182,11 @@ def register():
             }
         }
 
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response), 201
 
     except Exception as error:
-        print('💥 Error en registro:', str(error))
+        logger.error('💥 Error en registro: %s', error, exc_info=True)
         return jsonify({
             'success': False,
             'message': 'Error al registrar usuario'
@@ -2,36 +2,55 @@ from flask import request, jsonify
 from models.project import Project
 from models.segment import Segment
 from config.database import get_db
+from utils.pagination import parse_pagination_args
+from utils.fields import parse_fields_arg, select_fields
+from utils.conditional import make_etag, is_not_modified, set_validators, not_modified_response
+from utils.response_cache import get_cached_response, cache_response, invalidate_project
+from config.logging_config import get_logger, summarize
+
+logger = get_logger(__name__)
+
+def _parse_project_fields(args):
+    """Leer ?fields= (campos del proyecto) y ?segment_fields= (campos de sus segmentos)"""
+    fields = parse_fields_arg(args, list(Project.RESPONSE_FIELDS) + list(Project.SEGMENT_FIELDS))
+    segment_fields = parse_fields_arg(args, Segment.RESPONSE_FIELDS, 'segment_fields')
+    return fields, segment_fields
+
+def _project_response(project_data, segments_data, fields=None):
+    """Proyecto con sus segmentos (ya en formato de respuesta), solo con los campos pedidos"""
+    project_data['segments'] = segments_data
+    project_data['segments_count'] = len(segments_data)
+    return select_fields(project_data, fields)
 
 def get_projects():
     """Obtener todos los proyectos con sus segmentos"""
     try:
-        print('🎬 Obteniendo todos los proyectos con sus segmentos')
+        logger.info('🎬 Obteniendo todos los proyectos con sus segmentos')
+        
+        # Paginación opcional por cursor (?limit=&after=) y campos de la respuesta (?fields=)
+        try:
+            limit, after = parse_pagination_args(request.args)
+            fields, segment_fields = _parse_project_fields(request.args)
+        except ValueError as error:
+            return jsonify({
+                'success': False,
+                'message': str(error)
+            }), 400
         
         # Obtener base de datos
         db = get_db()
         
-        # Obtener todos los proyectos
-        projects = Project.find_all(db)
+        # Obtener proyectos con sus segmentos (una consulta por colección)
+        next_cursor = None
+        if limit:
+            projects, next_cursor = Project.find_page_with_segments(db, limit, after, fields, segment_fields, as_response=True)
+        else:
+            projects = Project.find_all_with_segments(db, fields=fields, segment_fields=segment_fields, as_response=True)
         
-        print(f'✅ Proyectos encontrados: {len(projects)}')
+        logger.info('✅ Proyectos encontrados: %s', len(projects))
         
         # Convertir a formato de respuesta e incluir segmentos
-        projects_data = []
-        for project in projects:
-            project_dict = project.to_response_dict()
-            
-            # Obtener segmentos del proyecto
-            print(f'🔍 Obteniendo segmentos para proyecto: {project._id}')
-            segments = Segment.find_by_project(db, str(project._id))
-            segments_data = [segment.to_response_dict() for segment in segments]
-            
-            # Agregar segmentos al proyecto
-            project_dict['segments'] = segments_data
-            project_dict['segments_count'] = len(segments_data)
-            
-            projects_data.append(project_dict)
-            print(f'✅ Proyecto {project._id} con {len(segments_data)} segmentos')
+        projects_data = [_project_response(project, segments, fields) for project, segments in projects]
         
         response = {
             'success': True,
@@ -41,12 +60,14 @@ def get_projects():
                 'count': len(projects_data)
             }
         }
+        if limit:
+            response['data']['next_cursor'] = next_cursor
         
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response)
         
     except Exception as error:
-        print('💥 Error al obtener proyectos:', str(error))
+        logger.error('💥 Error al obtener proyectos: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al obtener proyectos'
@@ -55,32 +76,56 @@ def get_projects():
 def get_project(project_id):
     """Obtener un proyecto por ID con sus segmentos"""
     try:
-        print(f'🎬 Obteniendo proyecto con ID: {project_id}')
+        logger.info('🎬 Obteniendo proyecto con ID: %s', project_id)
+        
+        try:
+            fields, segment_fields = _parse_project_fields(request.args)
+        except ValueError as error:
+            return jsonify({
+                'success': False,
+                'message': str(error)
+            }), 400
         
         # Obtener base de datos
         db = get_db()
         
-        # Buscar proyecto
-        project = Project.find_by_id(db, project_id)
+        # Consulta barata por _id: si el cliente ya tiene esta versión, responder 304
+        watermark = Project.get_watermark(db, project_id)
+        if watermark is None:
+            logger.warning('❌ Proyecto no encontrado: %s', project_id)
+            return jsonify({
+                'success': False,
+                'message': 'Proyecto no encontrado'
+            }), 404
+        
+        # Las respuestas incluyen vistas/likes: su versión también entra en el ETag
+        version, counters_version, last_modified = watermark
+        version = f'{version}.{counters_version}'
+        etag = make_etag('project', project_id, version)
+        if is_not_modified(etag, last_modified):
+            logger.debug('📤 Proyecto sin cambios (304): %s', project_id)
+            return not_modified_response(etag, last_modified)
+        
+        # Respuesta ya serializada para esta versión del proyecto
+        cached = get_cached_response('project', project_id, version)
+        if cached is not None:
+            logger.debug('📤 Proyecto desde caché: %s', project_id)
+            return set_validators(cached, etag, last_modified)
+        
+        # Buscar proyecto junto con sus segmentos
+        project, segments = Project.find_by_id_with_segments(db, project_id, fields, segment_fields, as_response=True)
         
         if not project:
-            print(f'❌ Proyecto no encontrado: {project_id}')
+            logger.warning('❌ Proyecto no encontrado: %s', project_id)
             return jsonify({
                 'success': False,
                 'message': 'Proyecto no encontrado'
             }), 404
         
-        print(f'✅ Proyecto encontrado: {project_id}')
-        
-        # Obtener segmentos del proyecto
-        print(f'🔍 Obteniendo segmentos para proyecto: {project_id}')
-        segments = Segment.find_by_project(db, project_id)
-        segments_data = [segment.to_response_dict() for segment in segments]
+        logger.info('✅ Proyecto encontrado: %s', project_id)
         
         # Preparar respuesta con proyecto y segmentos
-        project_data = project.to_response_dict()
-        project_data['segments'] = segments_data
-        project_data['segments_count'] = len(segments_data)
+        project_data = _project_response(project, segments, fields)
         
         response = {
             'success': True,
@@ -90,12 +135,12 @@ def get_project(project_id):
             }
         }
         
-        print(f'✅ Proyecto {project_id} con {len(segments_data)} segmentos')
-        print('📤 Enviando respuesta exitosa:', response)
-        return jsonify(response)
+        logger.info('✅ Proyecto %s con %s segmentos', project_id, len(segments))
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
+        return set_validators(cache_response('project', project_id, version, jsonify(response)), etag, last_modified)
         
     except Exception as error:
-        print('💥 Error al obtener proyecto:', str(error))
+        logger.error('💥 Error al obtener proyecto: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al obtener proyecto'
@@ -108,8 +153,8 @@ def create_project():
         video = data.get('video')
         audio = data.get('audio')
         
-        print('🎬 Creando nuevo proyecto')
-        print('📋 Datos recibidos:', {'video': video, 'audio': audio})
+        logger.info('🎬 Creando nuevo proyecto')
+        logger.debug('📋 Datos recibidos: %s', summarize({'video': video, 'audio': audio}))
 
         # Validar datos requeridos
         if not video:
@@ -124,13 +169,13 @@ def create_project():
         # Crear nuevo proyecto
         project = Project(video=video, audio=audio)
         
-        print('💾 Guardando proyecto en la base de datos...')
+        logger.debug('💾 Guardando proyecto en la base de datos...')
         project.save(db)
-        print('✅ Proyecto guardado exitosamente:', {
+        logger.info('✅ Proyecto guardado exitosamente: %s', summarize({
             '_id': str(project._id),
             'video': project.video,
             'audio': project.audio
-        })
+        }))
 
         # Respuesta exitosa
         response = {
@@ -141,11 +186,11 @@ def create_project():
             }
         }
 
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response), 201
 
     except Exception as error:
-        print('💥 Error al crear proyecto:', str(error))
+        logger.error('💥 Error al crear proyecto: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al crear proyecto'
@@ -158,8 +203,8 @@ def update_project(project_id):
         video = data.get('video')
         audio = data.get('audio')
         
-        print(f'🎬 Actualizando proyecto con ID: {project_id}')
-        print('📋 Datos recibidos:', {'video': video, 'audio': audio})
+        logger.info('🎬 Actualizando proyecto con ID: %s', project_id)
+        logger.debug('📋 Datos recibidos: %s', summarize({'video': video, 'audio': audio}))
 
         # Validar datos requeridos
         if not video:
@@ -171,27 +216,23 @@ def update_project(project_id):
         # Obtener base de datos
         db = get_db()
 
-        # Buscar proyecto
-        project = Project.find_by_id(db, project_id)
+        # Actualizar proyecto en una sola llamada
+        logger.debug('💾 Guardando cambios en la base de datos...')
+        project = Project.update_by_id(db, project_id, {'video': video, 'audio': audio})
+        invalidate_project(project_id)
         
         if not project:
-            print(f'❌ Proyecto no encontrado: {project_id}')
+            logger.warning('❌ Proyecto no encontrado: %s', project_id)
             return jsonify({
                 'success': False,
                 'message': 'Proyecto no encontrado'
             }), 404
 
-        # Actualizar proyecto
-        project.video = video
-        project.audio = audio
-        
-        print('💾 Guardando cambios en la base de datos...')
-        project.save(db)
-        print('✅ Proyecto actualizado exitosamente:', {
+        logger.info('✅ Proyecto actualizado exitosamente: %s', summarize({
             '_id': str(project._id),
             'video': project.video,
             'audio': project.audio
-        })
+        }))
 
         # Respuesta exitosa
         response = {
@@ -202,11 +243,11 @@ def update_project(project_id):
             }
         }
 
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response)
 
     except Exception as error:
-        print('💥 Error al actualizar proyecto:', str(error))
+        logger.error('💥 Error al actualizar proyecto: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al actualizar proyecto'
@@ -215,25 +256,22 @@ def update_project(project_id):
 def delete_project(project_id):
     """Eliminar un proyecto"""
     try:
-        print(f'🎬 Eliminando proyecto con ID: {project_id}')
+        logger.info('🎬 Eliminando proyecto con ID: %s', project_id)
         
         # Obtener base de datos
         db = get_db()
 
-        # Buscar proyecto
-        project = Project.find_by_id(db, project_id)
-        
-        if not project:
-            print(f'❌ Proyecto no encontrado: {project_id}')
+        # Eliminar proyecto en una sola llamada
+        logger.info('🗑️ Eliminando proyecto de la base de datos...')
+        deleted = Project.delete_by_id(db, project_id)
+        invalidate_project(project_id)
+        if not deleted:
+            logger.warning('❌ Proyecto no encontrado: %s', project_id)
             return jsonify({
                 'success': False,
                 'message': 'Proyecto no encontrado'
             }), 404
-
-        # Eliminar proyecto
-        print('🗑️ Eliminando proyecto de la base de datos...')
-        project.delete(db)
-        print('✅ Proyecto eliminado exitosamente:', project_id)
+        logger.info('✅ Proyecto eliminado exitosamente: %s', project_id)
 
         # Respuesta exitosa
         response = {
@@ -244,11 +282,11 @@ def delete_project(project_id):
             }
         }
 
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response)
 
     except Exception as error:
-        print('💥 Error al eliminar proyecto:', str(error))
+        logger.error('💥 Error al eliminar proyecto: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al eliminar proyecto'
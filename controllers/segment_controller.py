@@ -1,23 +1,49 @@
+import json
+import os
 from flask import request, jsonify
+from bson import ObjectId
 from models.segment import Segment
 from models.project import Project
 from config.database import get_db
+from utils.pagination import parse_pagination_args
+from utils.fields import parse_fields_arg
+from utils.conditional import make_etag, is_not_modified, set_validators, not_modified_response
+from utils.response_cache import get_cached_response, cache_response, invalidate_project
+from utils.streaming import NDJSON_MIMETYPE, wants_stream, wants_ndjson, stream_ndjson, stream_json_list
+from config.logging_config import get_logger, summarize
+
+logger = get_logger(__name__)
+
+# Límites de la creación masiva de segmentos
+BULK_MAX_SEGMENTS = int(os.environ.get('SEGMENTS_BULK_MAX', 10000))
+BULK_INSERT_CHUNK_SIZE = int(os.environ.get('SEGMENTS_BULK_CHUNK_SIZE', 500))
 
 def get_segments():
     """Obtener todos los segmentos"""
     try:
-        print('📹 Obteniendo todos los segmentos')
+        logger.info('📹 Obteniendo todos los segmentos')
+        
+        # Paginación opcional por cursor (?limit=&after=) y campos de la respuesta (?fields=)
+        try:
+            limit, after = parse_pagination_args(request.args)
+            fields = parse_fields_arg(request.args, Segment.RESPONSE_FIELDS)
+        except ValueError as error:
+            return jsonify({
+                'success': False,
+                'message': str(error)
+            }), 400
         
         # Obtener base de datos
         db = get_db()
         
-        # Obtener todos los segmentos
-        segments = Segment.find_all(db)
+        # Obtener segmentos (todos o una página)
+        next_cursor = None
+        if limit:
+            segments_data, next_cursor = Segment.find_page(db, limit, after, fields, as_response=True)
+        else:
+            segments_data = Segment.find_all(db, fields, as_response=True)
         
-        print(f'✅ Segmentos encontrados: {len(segments)}')
-        
-        # Convertir a formato de respuesta
-        segments_data = [segment.to_response_dict() for segment in segments]
+        logger.info('✅ Segmentos encontrados: %s', len(segments_data))
         
         response = {
             'success': True,
@@ -27,12 +53,14 @@ def get_segments():
                 'count': len(segments_data)
             }
         }
+        if limit:
+            response['data']['next_cursor'] = next_cursor
         
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response)
         
     except Exception as error:
-        print('💥 Error al obtener segmentos:', str(error))
+        logger.error('💥 Error al obtener segmentos: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al obtener segmentos'
@@ -41,22 +69,30 @@ def get_segments():
 def get_segment(segment_id):
     """Obtener un segmento por ID"""
     try:
-        print(f'📹 Obteniendo segmento con ID: {segment_id}')
+        logger.info('📹 Obteniendo segmento con ID: %s', segment_id)
+        
+        try:
+            fields = parse_fields_arg(request.args, Segment.RESPONSE_FIELDS)
+        except ValueError as error:
+            return jsonify({
+                'success': False,
+                'message': str(error)
+            }), 400
         
         # Obtener base de datos
         db = get_db()
         
         # Buscar segmento
-        segment = Segment.find_by_id(db, segment_id)
+        segment = Segment.find_by_id(db, segment_id, fields)
         
         if not segment:
-            print(f'❌ Segmento no encontrado: {segment_id}')
+            logger.warning('❌ Segmento no encontrado: %s', segment_id)
             return jsonify({
                 'success': False,
                 'message': 'Segmento no encontrado'
             }), 404
         
-        print(f'✅ Segmento encontrado: {segment_id}')
+        logger.info('✅ Segmento encontrado: %s', segment_id)
         
         response = {
             'success': True,
@@ -66,11 +102,11 @@ def get_segment(segment_id):
             }
         }
         
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response)
         
     except Exception as error:
-        print('💥 Error al obtener segmento:', str(error))
+        logger.error('💥 Error al obtener segmento: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al obtener segmento'
@@ -79,49 +115,82 @@ def get_segment(segment_id):
 def get_segments_by_project(project_id):
     """Obtener segmentos por proyecto"""
     try:
-        print(f'📹 Obteniendo segmentos del proyecto: {project_id}')
-        print(f'📋 Tipo de project_id: {type(project_id)}')
+        logger.info('📹 Obteniendo segmentos del proyecto: %s', project_id)
+        logger.debug('📋 Tipo de project_id: %s', type(project_id))
         
         # Validar project_id
         if not project_id:
-            print('❌ project_id es None o vacío')
+            logger.warning('❌ project_id es None o vacío')
             return jsonify({
                 'success': False,
                 'message': 'ID de proyecto requerido'
             }), 400
         
+        # Ventana de tiempo opcional (?from=&to=) y campos de la respuesta (?fields=)
+        try:
+            start, end = _parse_time_range(request.args)
+            fields = parse_fields_arg(request.args, Segment.RESPONSE_FIELDS)
+        except ValueError as error:
+            return jsonify({
+                'success': False,
+                'message': str(error)
+            }), 400
+        
         # Obtener base de datos
         db = get_db()
-        print(f'🗄️ Base de datos conectada: {db.name}')
+        logger.debug('🗄️ Base de datos conectada: %s', db.name)
         
-        # Verificar que el proyecto existe
-        print(f'🔍 Verificando existencia del proyecto: {project_id}')
-        project = Project.find_by_id(db, project_id)
-        if not project:
-            print(f'❌ Proyecto no encontrado: {project_id}')
+        # Verificar que el proyecto existe y obtener su versión (consulta barata por _id)
+        logger.debug('🔍 Verificando existencia del proyecto: %s', project_id)
+        watermark = Project.get_watermark(db, project_id)
+        if watermark is None:
+            logger.warning('❌ Proyecto no encontrado: %s', project_id)
             return jsonify({
                 'success': False,
                 'message': 'Proyecto no encontrado'
             }), 404
         
-        print(f'✅ Proyecto encontrado: {project_id}')
+        logger.info('✅ Proyecto encontrado: %s', project_id)
+        
+        # Si el cliente ya tiene esta versión, responder 304 sin leer los segmentos
+        # Las respuestas incluyen vistas/likes: su versión también entra en el ETag
+        version, counters_version, last_modified = watermark
+        version = f'{version}.{counters_version}'
+        etag = make_etag('segments', project_id, version)
+        if is_not_modified(etag, last_modified):
+            logger.debug('📤 Segmentos sin cambios (304): %s', project_id)
+            return not_modified_response(etag, last_modified)
+        
+        # Respuesta ya serializada para esta versión del proyecto
+        cached = get_cached_response('segments', project_id, version)
+        if cached is not None:
+            logger.debug('📤 Segmentos desde caché: %s', project_id)
+            return set_validators(cached, etag, last_modified)
+        
+        # Datos comunes a la respuesta completa y en streaming
+        response_data = {'project_id': project_id}
+        if start is not None or end is not None:
+            response_data['from'] = start
+            response_data['to'] = end
+        
+        # Respuesta en streaming: el cursor se recorre a medida que se envía
+        if wants_stream(request):
+            segments_iter = Segment.iter_by_project(db, project_id, start, end, fields, as_response=True)
+            if wants_ndjson(request):
+                return set_validators(stream_ndjson(segments_iter), etag, last_modified)
+            return set_validators(stream_json_list(
+                {'success': True, 'message': 'Segmentos obtenidos exitosamente'},
+                response_data,
+                'segments',
+                segments_iter
+            ), etag, last_modified)
         
         # Obtener segmentos del proyecto
-        print(f'🔍 Buscando segmentos para proyecto: {project_id}')
-        segments = Segment.find_by_project(db, project_id)
-        
-        print(f'✅ Segmentos encontrados: {len(segments)}')
-        
-        # Convertir a formato de respuesta
-        print('🔄 Convirtiendo segmentos a formato de respuesta...')
-        segments_data = []
-        for i, segment in enumerate(segments):
-            try:
-                segment_dict = segment.to_response_dict()
-                segments_data.append(segment_dict)
-                print(f'  ✅ Segmento {i+1} convertido: {segment_dict.get("_id", "sin_id")}')
-            except Exception as e:
-                print(f'  ❌ Error al convertir segmento {i+1}: {str(e)}')
+        logger.debug('🔍 Buscando segmentos para proyecto: %s', project_id)
+        # Directo de documentos de MongoDB a formato de respuesta (sin objetos Segment)
+        segments_data = Segment.find_by_project(db, project_id, start, end, fields, as_response=True)
+        
+        logger.info('✅ Segmentos encontrados: %s', len(segments_data))
         
         response = {
             'success': True,
@@ -129,22 +198,109 @@ def get_segments_by_project(project_id):
             'data': {
                 'segments': segments_data,
                 'count': len(segments_data),
-                'project_id': project_id
+                **response_data
             }
         }
         
-        print('📤 Enviando respuesta exitosa:', response)
-        return jsonify(response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
+        return set_validators(cache_response('segments', project_id, version, jsonify(response)), etag, last_modified)
+        
+    except Exception as error:
+        logger.error('💥 Error al obtener segmentos del proyecto: %s', error, exc_info=True)
+        return jsonify({
+            'success': False,
+            'message': 'Error al obtener segmentos del proyecto'
+        }), 500
+
+def get_segments_at_time(project_id):
+    """Obtener los segmentos activos de un proyecto en el instante ?t= (segundos)"""
+    try:
+        try:
+            t = float(request.args.get('t', ''))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'El parámetro t es requerido y debe ser numérico'
+            }), 400
+        try:
+            fields = parse_fields_arg(request.args, Segment.RESPONSE_FIELDS)
+        except ValueError as error:
+            return jsonify({
+                'success': False,
+                'message': str(error)
+            }), 400
+        if t != t or t < 0:
+            return jsonify({
+                'success': False,
+                'message': 'El parámetro t debe ser mayor o igual a 0'
+            }), 400
+        
+        db = get_db()
+        # Índice en memoria por proyecto: la mayoría de los ticks no consultan MongoDB
+        # (la versión se vuelve a comprobar como mucho una vez por segundo, ver Segment.interval_index)
+        index = Segment.interval_index(db, project_id)
+        if index is None:
+            logger.warning('❌ Proyecto no encontrado: %s', project_id)
+            return jsonify({
+                'success': False,
+                'message': 'Proyecto no encontrado'
+            }), 404
+        
+        segments_data = [segment.to_response_dict(fields) for segment in index.at(t)]
+        logger.debug('🎯 Segmentos activos en %s: %s', t, len(segments_data))
+        
+        return jsonify({
+            'success': True,
+            'message': 'Segmentos obtenidos exitosamente',
+            'data': {
+                'segments': segments_data,
+                'count': len(segments_data),
+                'project_id': project_id,
+                't': t
+            }
+        })
         
     except Exception as error:
-        print('💥 Error al obtener segmentos del proyecto:', str(error))
-        import traceback
-        print('📋 Stack trace:', traceback.format_exc())
+        logger.error('💥 Error al obtener segmentos en el instante: %s', error, exc_info=True)
         return jsonify({
             'success': False,
             'message': 'Error al obtener segmentos del proyecto'
         }), 500
 
+def _parse_time_range(args):
+    """Leer ?from=&to= (segundos); retorna (start, end) con None si no se envían
+
+    Lanza ValueError si los parámetros no son válidos.
+    """
+    bounds = []
+    for name in ('from', 'to'):
+        value = args.get(name)
+        if value is None or value == '':
+            bounds.append(None)
+            continue
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f'El parámetro {name} debe ser numérico')
+        if value != value or value < 0:
+            raise ValueError(f'El parámetro {name} debe ser mayor o igual a 0')
+        bounds.append(value)
+    start, end = bounds
+    if start is not None and end is not None and start > end:
+        raise ValueError('El parámetro from debe ser menor o igual a to')
+    return start, end
+
+def _validate_segment_times(start_time, end_time):
+    """Validar los tiempos de un segmento; retorna el mensaje de error o None"""
+    for value in (start_time, end_time):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return 'Los tiempos deben ser numéricos'
+    if start_time < 0 or end_time < 0:
+        return 'Los tiempos deben ser mayores o iguales a 0'
+    if start_time >= end_time:
+        return 'El tiempo de inicio debe ser menor al tiempo de fin'
+    return None
+
 def create_segment():
     """Crear un nuevo segmento"""
     try:
@@ -157,8 +313,8 @@ def create_segment():
         description = data.get('description')
         descriptions_prosody = data.get('Descriptions_prosody', [])
         
-        print('📹 Creando nuevo segmento')
-        print('📋 Datos recibidos:', {
+        logger.info('📹 Creando nuevo segmento')
+        logger.debug('📋 Datos recibidos: %s', summarize({
             'start_time': start_time,
             'end_time': end_time,
             'project_id': project_id,
@@ -166,7 +322,7 @@ def create_segment():
             'prosody2': prosody2,
             'description': description,
             'descriptions_prosody': descriptions_prosody
-        })
+        }))
 
         # Validar datos requeridos
         if start_time is None or end_time is None or not project_id:
@@ -176,16 +332,11 @@ def create_segment():
             }), 400
 
         # Validar que los tiempos sean válidos
-        if start_time < 0 or end_time < 0:
+        error_message = _validate_segment_times(start_time, end_time)
+        if error_message:
             return jsonify({
                 'success': False,
-                'message': 'Los tiempos deben ser mayores o iguales a 0'
-            }), 400
-
-        if start_time >= end_time:
-            return jsonify({
-                'success': False,
-                'message': 'El tiempo de inicio debe ser menor al tiempo de fin'
+                'message': error_message
             }), 400
 
         # Obtener base de datos
@@ -194,7 +345,7 @@ def create_segment():
         # Verificar que el proyecto existe
         project = Project.find_by_id(db, project_id)
         if not project:
-            print(f'❌ Proyecto no encontrado: {project_id}')
+            logger.warning('❌ Proyecto no encontrado: %s', project_id)
             return jsonify({
                 'success': False,
                 'message': 'Proyecto no encontrado'
@@ -211,14 +362,15 @@ def create_segment():
             descriptions_prosody=descriptions_prosody
         )
         
-        print('💾 Guardando segmento en la base de datos...')
+        logger.debug('💾 Guardando segmento en la base de datos...')
         segment.save(db)
-        print('✅ Segmento guardado exitosamente:', {
+        invalidate_project(project_id)
+        logger.info('✅ Segmento guardado exitosamente: %s', summarize({
             '_id': str(segment._id),
             'start_time': segment.start_time,
             'end_time': segment.end_time,
             'project_id': segment.project_id
-        })
+        }))
 
         # Respuesta exitosa
         response = {
@@ -229,16 +381,324 @@ def create_segment():
             }
         }
 
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response), 201
 
     except Exception as error:
-        print('💥 Error al crear segmento:', str(error))
+        logger.error('💥 Error al crear segmento: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al crear segmento'
         }), 500
 
+def _read_bulk_segments():
+    """Leer el cuerpo de una creación masiva: JSON ({projectid, segments, ordered} o arreglo) o NDJSON"""
+    ordered = request.args.get('ordered', 'true').lower() != 'false'
+    project_id = request.args.get('projectid')
+    
+    if request.mimetype == NDJSON_MIMETYPE:
+        items = []
+        for line in request.stream:
+            line = line.strip()
+            if line:
+                items.append(json.loads(line))
+        return project_id, items, ordered
+    
+    data = request.get_json()
+    if isinstance(data, list):
+        return project_id, data, ordered
+    if isinstance(data, dict):
+        return data.get('projectid', project_id), data.get('segments'), data.get('ordered', ordered)
+    return project_id, None, ordered
+
+def create_segments_bulk():
+    """Crear varios segmentos de un proyecto en lotes (insert_many)"""
+    try:
+        try:
+            project_id, items, ordered = _read_bulk_segments()
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'El cuerpo NDJSON no es válido'
+            }), 400
+        
+        logger.info('📹 Creación masiva de segmentos para proyecto: %s', project_id)
+
+        # Validar datos requeridos
+        if not project_id or not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'message': 'projectid y una lista de segmentos son requeridos'
+            }), 400
+        
+        if len(items) > BULK_MAX_SEGMENTS:
+            return jsonify({
+                'success': False,
+                'message': f'Máximo {BULK_MAX_SEGMENTS} segmentos por petición'
+            }), 400
+
+        # Validar todos los segmentos en una sola pasada
+        results = []
+        segments = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                error_message = 'El segmento debe ser un objeto'
+            elif item.get('startTime') is None or item.get('endTime') is None:
+                error_message = 'startTime y endTime son requeridos'
+            elif item.get('projectid') not in (None, project_id):
+                error_message = 'El projectid del segmento no coincide'
+            else:
+                error_message = _validate_segment_times(item['startTime'], item['endTime'])
+            
+            if error_message:
+                results.append({'index': index, 'success': False, 'message': error_message})
+                continue
+            
+            results.append(None)
+            segments.append((index, Segment(
+                start_time=item['startTime'],
+                end_time=item['endTime'],
+                project_id=project_id,
+                prosody=item.get('prosody'),
+                prosody2=item.get('prosody2'),
+                description=item.get('description'),
+                descriptions_prosody=item.get('Descriptions_prosody', [])
+            )))
+        
+        invalid_count = len(items) - len(segments)
+        if ordered and invalid_count:
+            return jsonify({
+                'success': False,
+                'message': 'Hay segmentos inválidos, no se insertó ninguno',
+                'data': {
+                    'results': [result for result in results if result],
+                    'inserted_count': 0
+                }
+            }), 400
+
+        # Obtener base de datos
+        db = get_db()
+
+        # Verificar una sola vez que el proyecto existe
+        project = Project.find_by_id(db, project_id)
+        if not project:
+            logger.warning('❌ Proyecto no encontrado: %s', project_id)
+            return jsonify({
+                'success': False,
+                'message': 'Proyecto no encontrado'
+            }), 404
+
+        # Insertar en lotes
+        logger.debug('💾 Insertando %s segmentos en lotes de %s...', len(segments), BULK_INSERT_CHUNK_SIZE)
+        errors = Segment.insert_many(
+            db, [segment for _, segment in segments], ordered=ordered, chunk_size=BULK_INSERT_CHUNK_SIZE
+        )
+        invalidate_project(project_id)
+        for (index, segment), error_message in zip(segments, errors):
+            if error_message:
+                results[index] = {'index': index, 'success': False, 'message': error_message}
+            else:
+                results[index] = {'index': index, 'success': True, '_id': str(segment._id)}
+        
+        inserted_count = sum(1 for result in results if result['success'])
+        logger.info('✅ Segmentos insertados: %s de %s', inserted_count, len(items))
+        
+        if inserted_count == len(items):
+            status = 201
+        elif inserted_count:
+            status = 207
+        else:
+            status = 400
+        
+        return jsonify({
+            'success': inserted_count == len(items),
+            'message': 'Segmentos creados' if inserted_count == len(items) else 'Algunos segmentos no se crearon',
+            'data': {
+                'results': results,
+                'inserted_count': inserted_count,
+                'count': len(items),
+                'project_id': project_id
+            }
+        }), status
+
+    except Exception as error:
+        logger.error('💥 Error en creación masiva de segmentos: %s', error, exc_info=True)
+        return jsonify({
+            'success': False,
+            'message': 'Error al crear segmentos'
+        }), 500
+
+# Campos del cuerpo de la petición -> atributos del segmento
+UPDATABLE_FIELDS = {
+    'startTime': 'start_time',
+    'endTime': 'end_time',
+    'prosody': 'prosody',
+    'prosody2': 'prosody2',
+    'description': 'description',
+    'Descriptions_prosody': 'descriptions_prosody'
+}
+
+def update_segments_bulk():
+    """Actualizar parcialmente y/o eliminar varios segmentos en un solo bulk_write"""
+    try:
+        data = request.get_json() or {}
+        updates = data.get('updates') or []
+        deletes = data.get('deletes') or []
+        ordered = data.get('ordered', True)
+        use_transaction = data.get('transaction', False)
+        
+        logger.info('📹 Edición masiva: %s actualizaciones, %s eliminaciones', len(updates), len(deletes))
+
+        # Validar datos requeridos
+        if not isinstance(updates, list) or not isinstance(deletes, list) or not (updates or deletes):
+            return jsonify({
+                'success': False,
+                'message': 'Se requiere una lista de updates y/o deletes'
+            }), 400
+        
+        if len(updates) + len(deletes) > BULK_MAX_SEGMENTS:
+            return jsonify({
+                'success': False,
+                'message': f'Máximo {BULK_MAX_SEGMENTS} operaciones por petición'
+            }), 400
+
+        # Validar identificadores y detectar repetidos
+        update_results = [None] * len(updates)
+        delete_results = [None] * len(deletes)
+        seen_ids = set()
+        
+        def parse_id(raw_id):
+            if not isinstance(raw_id, str) or not ObjectId.is_valid(raw_id):
+                return None, 'ID de segmento inválido'
+            segment_object_id = ObjectId(raw_id)
+            if segment_object_id in seen_ids:
+                return None, 'Segmento repetido en la petición'
+            seen_ids.add(segment_object_id)
+            return segment_object_id, None
+        
+        update_ids = []
+        for index, item in enumerate(updates):
+            raw_id = item.get('_id') if isinstance(item, dict) else None
+            segment_object_id, error_message = parse_id(raw_id)
+            if not error_message and not any(field in item for field in UPDATABLE_FIELDS):
+                error_message = 'No hay campos para actualizar'
+            update_ids.append(segment_object_id)
+            if error_message:
+                update_results[index] = {'_id': raw_id, 'success': False, 'message': error_message}
+        
+        delete_ids = []
+        for index, raw_id in enumerate(deletes):
+            segment_object_id, error_message = parse_id(raw_id)
+            delete_ids.append(segment_object_id)
+            if error_message:
+                delete_results[index] = {'_id': raw_id, 'success': False, 'message': error_message}
+
+        # Obtener base de datos
+        db = get_db()
+
+        # Leer los tiempos actuales en una sola consulta y validar en memoria
+        current_times = Segment.find_times(db, [segment_object_id for segment_object_id in seen_ids])
+        
+        valid_updates = []
+        for index, item in enumerate(updates):
+            if update_results[index]:
+                continue
+            segment_object_id = update_ids[index]
+            if segment_object_id not in current_times:
+                update_results[index] = {'_id': item['_id'], 'success': False, 'message': 'Segmento no encontrado'}
+                continue
+            current_start, current_end, _ = current_times[segment_object_id]
+            start_time = item.get('startTime', current_start)
+            end_time = item.get('endTime', current_end)
+            if 'startTime' in item or 'endTime' in item:
+                error_message = _validate_segment_times(start_time, end_time)
+                if error_message:
+                    update_results[index] = {'_id': item['_id'], 'success': False, 'message': error_message}
+                    continue
+            fields = {attribute: item[field] for field, attribute in UPDATABLE_FIELDS.items() if field in item}
+            valid_updates.append((segment_object_id, (current_start, current_end), fields))
+            update_results[index] = {'_id': item['_id'], 'success': True, 'operation': 'update'}
+        
+        valid_deletes = []
+        for index, raw_id in enumerate(deletes):
+            if delete_results[index]:
+                continue
+            if delete_ids[index] not in current_times:
+                delete_results[index] = {'_id': raw_id, 'success': False, 'message': 'Segmento no encontrado'}
+                continue
+            valid_deletes.append(delete_ids[index])
+            delete_results[index] = {'_id': raw_id, 'success': True, 'operation': 'delete'}
+        
+        results = update_results + delete_results
+        failed_count = sum(1 for result in results if not result['success'])
+        if ordered and failed_count:
+            return jsonify({
+                'success': False,
+                'message': 'Hay operaciones inválidas, no se aplicó ninguna',
+                'data': {
+                    'results': [result for result in results if not result['success']],
+                    'modified_count': 0,
+                    'deleted_count': 0
+                }
+            }), 400
+
+        # Aplicar todo en un solo bulk_write
+        logger.debug('💾 Aplicando %s operaciones...', len(valid_updates) + len(valid_deletes))
+        affected_projects = [current_times[segment_object_id][2] for segment_object_id, _, _ in valid_updates]
+        affected_projects += [current_times[segment_object_id][2] for segment_object_id in valid_deletes]
+        summary = Segment.bulk_update(
+            db, valid_updates, valid_deletes,
+            ordered=bool(ordered), use_transaction=bool(use_transaction), project_ids=affected_projects
+        )
+        if not summary['rolled_back']:
+            invalidate_project(*affected_projects)
+        
+        # Los filtros incluyen los tiempos leídos: si no coinciden, otro cliente modificó el segmento
+        # (una eliminación de un segmento ya eliminado deja el mismo estado y no es conflicto)
+        update_indexes = {segment_object_id: index for index, segment_object_id in enumerate(update_ids)}
+        for segment_object_id in summary['conflicts']:
+            index = update_indexes[segment_object_id]
+            update_results[index] = {
+                '_id': updates[index]['_id'],
+                'success': False,
+                'message': 'El segmento fue modificado por otro cliente'
+            }
+        conflicts = len(summary['conflicts'])
+        if summary['rolled_back']:
+            # Transacción revertida: ninguna operación del lote quedó aplicada
+            for result in update_results + delete_results:
+                if result['success']:
+                    result.update(success=False, message='No se aplicó: la transacción se revirtió por conflictos')
+                    result.pop('operation', None)
+        results = update_results + delete_results
+        logger.info('✅ Edición masiva aplicada: %s', summary)
+        
+        if summary['rolled_back']:
+            status, message = 409, 'Hay conflictos, no se aplicó ninguna operación'
+        elif conflicts or failed_count:
+            # Aplicación parcial: results indica qué operaciones se aplicaron y cuáles no
+            status, message = 207, 'Algunas operaciones no se aplicaron'
+        else:
+            status, message = 200, 'Segmentos actualizados exitosamente'
+        
+        return jsonify({
+            'success': status == 200,
+            'message': message,
+            'data': {
+                'results': results,
+                'modified_count': summary['modified'],
+                'deleted_count': summary['deleted'],
+                'conflicts': conflicts
+            }
+        }), status
+
+    except Exception as error:
+        logger.error('💥 Error en edición masiva de segmentos: %s', error, exc_info=True)
+        return jsonify({
+            'success': False,
+            'message': 'Error al actualizar segmentos'
+        }), 500
+
 def update_segment(segment_id):
     """Actualizar un segmento"""
     try:
@@ -250,70 +710,79 @@ def update_segment(segment_id):
         description = data.get('description')
         descriptions_prosody = data.get('Descriptions_prosody')
         
-        print(f'📹 Actualizando segmento con ID: {segment_id}')
-        print('📋 Datos recibidos:', {
+        logger.info('📹 Actualizando segmento con ID: %s', segment_id)
+        logger.debug('📋 Datos recibidos: %s', summarize({
             'start_time': start_time,
             'end_time': end_time,
             'prosody': prosody,
             'prosody2': prosody2,
             'description': description,
             'descriptions_prosody': descriptions_prosody
-        })
-
-        # Obtener base de datos
-        db = get_db()
-
-        # Buscar segmento
-        segment = Segment.find_by_id(db, segment_id)
-        
-        if not segment:
-            print(f'❌ Segmento no encontrado: {segment_id}')
-            return jsonify({
-                'success': False,
-                'message': 'Segmento no encontrado'
-            }), 404
+        }))
 
-        # Actualizar campos si se proporcionan
+        # Validar tiempos si se proporcionan
         if start_time is not None:
-            if start_time < 0:
+            if isinstance(start_time, bool) or not isinstance(start_time, (int, float)) or start_time < 0:
                 return jsonify({
                     'success': False,
                     'message': 'El tiempo de inicio debe ser mayor o igual a 0'
                 }), 400
-            segment.start_time = start_time
 
         if end_time is not None:
-            if end_time < 0:
+            if isinstance(end_time, bool) or not isinstance(end_time, (int, float)) or end_time < 0:
                 return jsonify({
                     'success': False,
                     'message': 'El tiempo de fin debe ser mayor o igual a 0'
                 }), 400
-            segment.end_time = end_time
 
-        # Validar que los tiempos sean válidos juntos
-        if start_time is not None or end_time is not None:
-            if segment.start_time >= segment.end_time:
+        # Si llegan ambos se validan aquí; si llega uno solo, lo valida el filtro del update
+        if start_time is not None and end_time is not None and start_time >= end_time:
+            return jsonify({
+                'success': False,
+                'message': 'El tiempo de inicio debe ser menor al tiempo de fin'
+            }), 400
+
+        fields = {
+            name: value for name, value in (
+                ('start_time', start_time),
+                ('end_time', end_time),
+                ('prosody', prosody),
+                ('prosody2', prosody2),
+                ('description', description),
+                ('descriptions_prosody', descriptions_prosody)
+            ) if value is not None
+        }
+
+        # Obtener base de datos
+        db = get_db()
+
+        # Actualizar en una sola llamada
+        logger.debug('💾 Guardando cambios en la base de datos...')
+        if fields:
+            segment = Segment.update_by_id(db, segment_id, fields)
+            if segment:
+                invalidate_project(segment.project_id)
+        else:
+            segment = Segment.find_by_id(db, segment_id)
+        
+        if not segment:
+            # Solo en el caso de error se distingue "no existe" de "tiempos inválidos"
+            if fields and Segment.exists(db, segment_id):
                 return jsonify({
                     'success': False,
                     'message': 'El tiempo de inicio debe ser menor al tiempo de fin'
                 }), 400
-
-        if prosody is not None:
-            segment.prosody = prosody
-        if prosody2 is not None:
-            segment.prosody2 = prosody2
-        if description is not None:
-            segment.description = description
-        if descriptions_prosody is not None:
-            segment.descriptions_prosody = descriptions_prosody
+            logger.warning('❌ Segmento no encontrado: %s', segment_id)
+            return jsonify({
+                'success': False,
+                'message': 'Segmento no encontrado'
+            }), 404
         
-        print('💾 Guardando cambios en la base de datos...')
-        segment.save(db)
-        print('✅ Segmento actualizado exitosamente:', {
+        logger.info('✅ Segmento actualizado exitosamente: %s', summarize({
             '_id': str(segment._id),
             'start_time': segment.start_time,
             'end_time': segment.end_time
-        })
+        }))
 
         # Respuesta exitosa
         response = {
@@ -324,11 +793,11 @@ def update_segment(segment_id):
             }
         }
 
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response)
 
     except Exception as error:
-        print('💥 Error al actualizar segmento:', str(error))
+        logger.error('💥 Error al actualizar segmento: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al actualizar segmento'
@@ -350,42 +819,32 @@ def update_descriptions_prosody():
                 'message': 'Faltan campos requeridos'
             }), 400
 
+        # El nombre del campo se usa en la ruta del update: no puede contener '.' ni '$'
+        if not isinstance(field_name, str) or '.' in field_name or field_name.startswith('$') \
+                or field_name in ('user_id', 'timestamps'):
+            return jsonify({
+                'success': False,
+                'message': 'Nombre de campo inválido'
+            }), 400
+
         db = get_db()
-        segment = Segment.find_by_id(db, segment_id)
-        if not segment:
+
+        # Actualización atómica de la entrada del usuario (sin leer ni reescribir el arreglo)
+        segment = Segment.set_prosody_field(db, segment_id, user_id, field_name, field_value, timestamp)
+        if segment is None:
             return jsonify({
                 'success': False,
                 'message': 'Segmento no encontrado'
             }), 404
+        invalidate_project(segment.project_id)
 
-        # Buscar si el usuario ya tiene entrada en descriptions_prosody
-        updated = False
-        for entry in segment.descriptions_prosody:
-            if entry.get('user_id') == user_id:
-                entry[field_name] = field_value
-                # Guardar timestamp por campo
-                if 'timestamps' not in entry:
-                    entry['timestamps'] = {}
-                entry['timestamps'][field_name] = timestamp
-                updated = True
-                break
-        if not updated:
-            # Crear nueva entrada para el usuario
-            new_entry = {
-                'user_id': user_id,
-                field_name: field_value,
-                'timestamps': {field_name: timestamp}
-            }
-            segment.descriptions_prosody.append(new_entry)
-
-        segment.save(db)
         return jsonify({
             'success': True,
             'message': 'Campo actualizado exitosamente',
             'data': {'segment': segment.to_response_dict()}
         })
     except Exception as error:
-        print('💥 Error en update_descriptions_prosody:', str(error))
+        logger.error('💥 Error en update_descriptions_prosody: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al actualizar descriptions_prosody'
@@ -394,25 +853,22 @@ def update_descriptions_prosody():
 def delete_segment(segment_id):
     """Eliminar un segmento"""
     try:
-        print(f'📹 Eliminando segmento con ID: {segment_id}')
+        logger.info('📹 Eliminando segmento con ID: %s', segment_id)
         
         # Obtener base de datos
         db = get_db()
 
-        # Buscar segmento
-        segment = Segment.find_by_id(db, segment_id)
-        
-        if not segment:
-            print(f'❌ Segmento no encontrado: {segment_id}')
+        # Eliminar segmento en una sola llamada
+        logger.info('🗑️ Eliminando segmento de la base de datos...')
+        segment_project_id = Segment.delete_by_id(db, segment_id)
+        if not segment_project_id:
+            logger.warning('❌ Segmento no encontrado: %s', segment_id)
             return jsonify({
                 'success': False,
                 'message': 'Segmento no encontrado'
             }), 404
-
-        # Eliminar segmento
-        print('🗑️ Eliminando segmento de la base de datos...')
-        segment.delete(db)
-        print('✅ Segmento eliminado exitosamente:', segment_id)
+        invalidate_project(segment_project_id)
+        logger.info('✅ Segmento eliminado exitosamente: %s', segment_id)
 
         # Respuesta exitosa
         response = {
@@ -423,11 +879,11 @@ def delete_segment(segment_id):
             }
         }
 
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response)
 
     except Exception as error:
-        print('💥 Error al eliminar segmento:', str(error))
+        logger.error('💥 Error al eliminar segmento: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al eliminar segmento'
@@ -436,24 +892,22 @@ def delete_segment(segment_id):
 def increment_views(segment_id):
     """Incrementar contador de vistas de un segmento"""
     try:
-        print(f'📹 Incrementando vistas del segmento: {segment_id}')
+        logger.info('📹 Incrementando vistas del segmento: %s', segment_id)
         
         # Obtener base de datos
         db = get_db()
 
-        # Buscar segmento
-        segment = Segment.find_by_id(db, segment_id)
+        # Incrementar vistas (una sola operación atómica)
+        views = Segment.increment_counter(db, segment_id, 'views')
         
-        if not segment:
-            print(f'❌ Segmento no encontrado: {segment_id}')
+        if views is None:
+            logger.warning('❌ Segmento no encontrado: %s', segment_id)
             return jsonify({
                 'success': False,
                 'message': 'Segmento no encontrado'
             }), 404
 
-        # Incrementar vistas
-        segment.increment_views(db)
-        print(f'✅ Vistas incrementadas: {segment.views}')
+        logger.info('✅ Vistas incrementadas: %s', views)
 
         # Respuesta exitosa
         response = {
@@ -461,15 +915,15 @@ def increment_views(segment_id):
             'message': 'Vistas incrementadas exitosamente',
             'data': {
                 'segment_id': segment_id,
-                'views': segment.views
+                'views': views
             }
         }
 
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response)
 
     except Exception as error:
-        print('💥 Error al incrementar vistas:', str(error))
+        logger.error('💥 Error al incrementar vistas: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al incrementar vistas'
@@ -478,24 +932,22 @@ def increment_views(segment_id):
 def increment_likes(segment_id):
     """Incrementar contador de likes de un segmento"""
     try:
-        print(f'📹 Incrementando likes del segmento: {segment_id}')
+        logger.info('📹 Incrementando likes del segmento: %s', segment_id)
         
         # Obtener base de datos
         db = get_db()
 
-        # Buscar segmento
-        segment = Segment.find_by_id(db, segment_id)
+        # Incrementar likes (una sola operación atómica)
+        likes = Segment.increment_counter(db, segment_id, 'likes')
         
-        if not segment:
-            print(f'❌ Segmento no encontrado: {segment_id}')
+        if likes is None:
+            logger.warning('❌ Segmento no encontrado: %s', segment_id)
             return jsonify({
                 'success': False,
                 'message': 'Segmento no encontrado'
             }), 404
 
-        # Incrementar likes
-        segment.increment_likes(db)
-        print(f'✅ Likes incrementados: {segment.likes}')
+        logger.info('✅ Likes incrementados: %s', likes)
 
         # Respuesta exitosa
         response = {
@@ -503,15 +955,15 @@ def increment_likes(segment_id):
             'message': 'Likes incrementados exitosamente',
             'data': {
                 'segment_id': segment_id,
-                'likes': segment.likes
+                'likes': likes
             }
         }
 
-        print('📤 Enviando respuesta exitosa:', response)
+        logger.debug('📤 Enviando respuesta exitosa: %s', summarize(response))
         return jsonify(response)
 
     except Exception as error:
-        print('💥 Error al incrementar likes:', str(error))
+        logger.error('💥 Error al incrementar likes: %s', error)
         return jsonify({
             'success': False,
             'message': 'Error al incrementar likes'
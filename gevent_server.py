@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Servidor cooperativo (gevent) para el backend de Flask
+Cada petición corre en un greenlet: mientras espera a MongoDB no ocupa un hilo
+del sistema, así un proceso atiende muchas más conexiones del reproductor.
+Requiere: pip install gevent
+"""
+
+# monkey.patch_all debe ejecutarse antes de importar pymongo, threading o la app
+from gevent import monkey
+monkey.patch_all()
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+from index import app
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 5000))
+    max_connections = int(os.environ.get('ASYNC_MAX_CONNECTIONS', 1000))
+
+    print(f"🚀 Servidor cooperativo (gevent) en puerto {port}")
+    print(f"🔌 Conexiones concurrentes máximas: {max_connections}")
+    print(f"🗄️ Pool de MongoDB: {os.environ.get('MONGODB_MAX_POOL_SIZE', 50)} conexiones")
+
+    server = WSGIServer(('0.0.0.0', port), app, spawn=Pool(max_connections), log=None)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido por el usuario")
@@ -0,0 +1,88 @@
+"""
+Configuración de gunicorn para producción
+gunicorn --config gunicorn.conf.py index:app (python run.py con SERVER_MODE=gunicorn)
+"""
+
+import math
+import os
+from dotenv import load_dotenv
+
+# Cargar .env antes de leer la configuración (PORT, WEB_CONCURRENCY, ...)
+load_dotenv()
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def _read_first_line(path):
+    try:
+        with open(path) as file:
+            return file.readline().split()
+    except OSError:
+        return None
+
+def _available_cpus():
+    """Núcleos que puede usar el proceso: afinidad y cuota de cgroups (contenedores)
+
+    os.cpu_count() muestra los núcleos del host aunque el contenedor tenga una cuota menor.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+    # cgroup v2: "<cuota> <periodo>" o "max <periodo>"
+    quota = _read_first_line('/sys/fs/cgroup/cpu.max')
+    if quota and quota[0] != 'max':
+        return max(1, min(cpus, math.ceil(int(quota[0]) / int(quota[1]))))
+    # cgroup v1: cuota -1 = sin límite
+    quota = _read_first_line('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+    period = _read_first_line('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+    if quota and period and int(quota[0]) > 0:
+        return max(1, min(cpus, math.ceil(int(quota[0]) / int(period[0]))))
+    return cpus
+
+# Red
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+backlog = _env_int('GUNICORN_BACKLOG', 2048)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Procesos: WEB_CONCURRENCY o 2 por núcleo disponible + 1, hasta GUNICORN_MAX_WORKERS; cada uno con hilos (gthread)
+# ASYNC_MODE=gevent usa workers cooperativos (requiere gevent) con muchas conexiones por proceso
+# Cada worker tiene su propio pool de MongoDB: conexiones posibles = workers * MONGODB_MAX_POOL_SIZE
+# (por instancia), y deben caber en el límite de conexiones del servidor de MongoDB.
+cpu_count = _available_cpus()
+workers = _env_int('WEB_CONCURRENCY', min(cpu_count * 2 + 1, _env_int('GUNICORN_MAX_WORKERS', 8)))
+if os.environ.get('ASYNC_MODE', '').lower() == 'gevent':
+    worker_class = 'gevent'
+    worker_connections = _env_int('ASYNC_MAX_CONNECTIONS', 1000)
+else:
+    worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+    threads = _env_int('GUNICORN_THREADS', 4)
+
+# Tiempos: las peticiones colgadas se cortan y los reinicios esperan a las que están en curso
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Reciclar workers cada cierto número de peticiones (con jitter para no reiniciarlos juntos)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Cargar la app una vez en el proceso maestro; los workers la heredan con fork
+# (no con gevent: pymongo debe importarse después del monkey patch de cada worker)
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true' and worker_class != 'gevent'
+
+# Logs de gunicorn (los de la app van por config.logging_config)
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+def post_fork(server, worker):
+    """Cada worker abre su propio cliente de MongoDB (el del maestro no es seguro tras fork)"""
+    from config.database import reset_client
+    reset_client()
+    server.log.info('🔌 Worker %s listo (cliente de MongoDB reiniciado)', worker.pid)
+
+def worker_exit(server, worker):
+    """Escribir contadores de vistas/likes pendientes antes de que el worker termine"""
+    from models.project import counter_versions
+    from models.segment import segment_counters
+    # Primero los segmentos: al escribirse marcan la versión de contadores de sus proyectos
+    segment_counters.shutdown()
+    counter_versions.shutdown()
@@ -1,97 +1,192 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
 from datetime import datetime
+import logging
 import os
+import time
 from dotenv import load_dotenv
-from config.database import connect_db
+
+# Cargar variables de entorno (antes de importar la configuración que las lee)
+load_dotenv()
+
+from config.database import connect_db, get_db, get_pool_stats
+from config.indexes import ensure_indexes
+from config.json_provider import FastJSONProvider
+from config.jwt_config import get_user_cache_stats
+from models.segment import segment_counters, get_interval_cache_stats
+from utils.response_cache import get_response_cache_stats
+from utils.compression import compress_response, get_compression_stats
+from config.logging_config import get_logger, summarize, should_sample, get_logging_stats
+from config.metrics import METRICS_ENABLED, observe_request, render_metrics
 from routes.auth import auth_bp
 from routes.projects import projects_bp
 from routes.segments import segments_bp
 
-# Cargar variables de entorno
-load_dotenv()
-
-# Crear aplicación Flask
-app = Flask(__name__)
+logger = get_logger(__name__)
 
-# Configuración
-app.config['JSON_SORT_KEYS'] = False
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+def create_app():
+    """Crear y configurar la aplicación Flask (servidor de desarrollo, gunicorn o gevent)"""
+    # Crear aplicación Flask
+    app = Flask(__name__)
 
-# Conectar a la base de datos (se conectará cuando se necesite)
-# connect_db()
+    # Configuración: JSON compacto con orjson si está instalado (JSON_PRETTY=true para indentar)
+    app.json = FastJSONProvider(app)
 
-# Configurar CORS
-CORS(app, origins='*', supports_credentials=False, methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+    # Conectar a la base de datos (se conectará cuando se necesite)
+    # connect_db()
 
-# Middleware de logging para todas las peticiones
-@app.before_request
-def log_request():
-    print(f"📨 {datetime.now().isoformat()} - {request.method} {request.path}")
-    print('📋 Headers:', dict(request.headers))
-    # Solo intentar parsear JSON si la petición tiene contenido y es JSON
-    if request.content_length and request.content_length > 0 and request.is_json:
+    # Crear índices declarados al iniciar (opcional, también: python scripts/manage_indexes.py ensure)
+    if os.environ.get('MONGODB_ENSURE_INDEXES', 'false').lower() == 'true':
         try:
-            body = request.get_json()
-            if body:
-                print('📝 Body:', body)
-        except Exception as e:
-            print('⚠️ Error al parsear JSON del body:', str(e))
-
-# Ruta de prueba
-@app.route('/', methods=['GET'])
-def home():
-    print('🏠 Petición a la ruta raíz')
-    return jsonify({
-        'message': 'Video Segments Player API',
-        'version': '1.0.0',
-        'status': 'running',
-        'timestamp': datetime.now().isoformat()
-    })
-
-# Registrar blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(projects_bp, url_prefix='/api/projects')
-app.register_blueprint(segments_bp, url_prefix='/api/segments')
-
-# Middleware de manejo de errores 404
-@app.errorhandler(404)
-def not_found(error):
-    print('❌ Ruta no encontrada:', request.url)
-    return jsonify({
-        'success': False,
-        'message': 'Ruta no encontrada',
-        'path': request.url
-    }), 404
-
-# Middleware de manejo de errores global
-@app.errorhandler(Exception)
-def handle_exception(error):
-    print('💥 Error global:', str(error))
-    print('📋 Stack trace:', error.__traceback__)
+            ensure_indexes(get_db())
+        except Exception as error:
+            logger.warning('⚠️ No se pudieron asegurar los índices: %s', error)
+
+    # Configurar CORS
+    CORS(app, origins='*', supports_credentials=False, methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])
+
+    # Métricas por endpoint: se registran antes que el resto para medir la petición completa
+    if METRICS_ENABLED:
+        @app.before_request
+        def start_timer():
+            g.request_started = time.perf_counter()
+        
+        # after_request corre en orden inverso: esta se ejecuta al final (después de comprimir)
+        @app.after_request
+        def record_request(response):
+            started = g.get('request_started')
+            if started is not None:
+                observe_request(request.endpoint, request.method, response.status_code, time.perf_counter() - started)
+            return response
     
-    # Error de validación
-    if hasattr(error, 'description'):
-        print('❌ Error de validación:', error.description)
+    # Middleware de logging para todas las peticiones
+    @app.before_request
+    def log_request():
+        # Muestreo por endpoint (LOG_SAMPLE_RATE / LOG_SAMPLE_ROUTES)
+        g.log_sampled = should_sample(request.endpoint)
+        if not g.log_sampled:
+            return
+        
+        logger.info('📨 %s %s', request.method, request.path)
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        
+        headers = {key: value for key, value in request.headers.items() if key.lower() != 'authorization'}
+        logger.debug('📋 Headers: %s', summarize(headers))
+        # Solo intentar parsear JSON si la petición tiene contenido y es JSON
+        if request.content_length and request.content_length > 0 and request.is_json:
+            try:
+                body = request.get_json()
+                if body:
+                    logger.debug('📝 Body: %s', summarize(body))
+            except Exception as e:
+                logger.warning('⚠️ Error al parsear JSON del body: %s', e)
+
+    # Compresión negociada (gzip/br/zstd) de respuestas mayores a COMPRESSION_MIN_SIZE
+    @app.after_request
+    def compress(response):
+        return compress_response(response, request)
+
+    # Ruta de prueba
+    @app.route('/', methods=['GET'])
+    def home():
+        logger.info('🏠 Petición a la ruta raíz')
+        return jsonify({
+            'message': 'Video Segments Player API',
+            'version': '1.0.0',
+            'status': 'running',
+            'timestamp': datetime.now().isoformat()
+        })
+
+    # Estadísticas del pool de conexiones a MongoDB
+    @app.route('/health/db', methods=['GET'])
+    def db_health():
+        return jsonify({
+            'success': True,
+            'data': {
+                'pool': get_pool_stats(),
+                'logging': get_logging_stats(),
+                'token_cache': get_user_cache_stats(),
+                'segment_counters': segment_counters.stats(),
+                'response_cache': get_response_cache_stats(),
+                'interval_indexes': get_interval_cache_stats(),
+                'compression': get_compression_stats()
+            }
+        })
+
+    # Métricas en formato de texto de Prometheus (por proceso)
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        pool = get_pool_stats()
+        response_cache = get_response_cache_stats()
+        token_cache = get_user_cache_stats()
+        counters = segment_counters.stats()
+        extra = [
+            ('mongodb_pool_connections', 'Conexiones del pool de MongoDB', 'gauge', [
+                ({'state': 'open'}, pool['connections_open']),
+                ({'state': 'in_use'}, pool['connections_in_use'])
+            ]),
+            ('cache_hits_total', 'Aciertos por caché', 'counter', [
+                ({'cache': 'response'}, response_cache['hits']),
+                ({'cache': 'token'}, token_cache['hits'])
+            ]),
+            ('cache_misses_total', 'Fallos por caché', 'counter', [
+                ({'cache': 'response'}, response_cache['misses']),
+                ({'cache': 'token'}, token_cache['misses'])
+            ]),
+            ('segment_counters_pending_documents', 'Segmentos con vistas/likes sin escribir', 'gauge', [
+                ({}, counters['pending_documents'])
+            ])
+        ]
+        return Response(render_metrics(extra), mimetype='text/plain; version=0.0.4')
+    
+    # Registrar blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(projects_bp, url_prefix='/api/projects')
+    app.register_blueprint(segments_bp, url_prefix='/api/segments')
+
+    # Middleware de manejo de errores 404
+    @app.errorhandler(404)
+    def not_found(error):
+        logger.warning('❌ Ruta no encontrada: %s', request.url)
         return jsonify({
             'success': False,
-            'message': 'Error de validación',
-            'errors': [error.description]
-        }), 400
+            'message': 'Ruta no encontrada',
+            'path': request.url
+        }), 404
+
+    # Middleware de manejo de errores global
+    @app.errorhandler(Exception)
+    def handle_exception(error):
+        logger.error('💥 Error global: %s', error, exc_info=error)
+        
+        # Error de validación
+        if hasattr(error, 'description'):
+            logger.warning('❌ Error de validación: %s', error.description)
+            return jsonify({
+                'success': False,
+                'message': 'Error de validación',
+                'errors': [error.description]
+            }), 400
+        
+        # Error genérico
+        logger.warning('❌ Error genérico: %s', error)
+        return jsonify({
+            'success': False,
+            'message': str(error) or 'Error interno del servidor'
+        }), 500
     
-    # Error genérico
-    print('❌ Error genérico:', str(error))
-    return jsonify({
-        'success': False,
-        'message': str(error) or 'Error interno del servidor'
-    }), 500
+    return app
+
+# Aplicación del módulo (gunicorn: index:app, ver gunicorn.conf.py)
+app = create_app()
 
 if __name__ == '__main__':
     PORT = int(os.environ.get('PORT', 5000))
     print(f"🚀 Servidor corriendo en puerto {PORT}")
-    print(f"🌍 Ambiente: {os.environ.get('FLASK_ENV', 'development')}")
+    print(f"🌍 Ambiente: {os.environ.get('FLASK_ENV', 'production')}")
     print(f"📡 API disponible en: http://localhost:{PORT}")
     print(f"🔐 Rutas de autenticación: http://localhost:{PORT}/api/auth")
     print(f"🎬 Rutas de proyectos: http://localhost:{PORT}/api/projects")
     print(f"📹 Rutas de segmentos: http://localhost:{PORT}/api/segments")
-    app.run(host='0.0.0.0', port=PORT, debug=True) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=PORT, debug=os.environ.get('FLASK_ENV') == 'development') 
\ No newline at end of file
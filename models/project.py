@@ -1,13 +1,57 @@
 from datetime import datetime
 from bson import ObjectId
+import os
+from pymongo import ReturnDocument
+from config.database import get_db
+from models.tracking import DirtyTracking
+from utils.counter_buffer import CounterBuffer
+from utils.pagination import find_page
+from utils.fields import mongo_projection, select_fields
+from utils.concurrency import run_parallel
 
-class Project:
+# Versión de contadores (vistas/likes) en el ETag: se escribe en lote, una vez por
+# intervalo y proyecto, para que un proyecto muy visto no cambie de ETag en cada vista
+counter_versions = CounterBuffer(
+    'projects',
+    get_db,
+    flush_interval=float(os.environ.get('PROJECT_COUNTERS_VERSION_INTERVAL', 5.0)),
+    set_fields=lambda: {'content_updated_at': datetime.utcnow()}
+)
+
+class Project(DirtyTracking):
+    __slots__ = ('_id', 'video', 'audio', 'created_at', 'updated_at', 'loaded_fields')
+    
+    # Nombre del atributo -> nombre del campo en MongoDB
+    FIELD_NAMES = {
+        'video': 'video',
+        'audio': 'audio',
+        'created_at': 'created_at'
+    }
+    
+    # Campo de la respuesta -> campos de MongoDB que necesita (?fields=)
+    RESPONSE_FIELDS = {
+        '_id': ('_id',),
+        'video': ('video',),
+        'audio': ('audio',),
+        'created_at': ('created_at',),
+        'updated_at': ('updated_at',)
+    }
+    # Campos de la respuesta que salen de los segmentos del proyecto
+    SEGMENT_FIELDS = ('segments', 'segments_count')
+    
     def __init__(self, video, audio=None, _id=None, created_at=None, updated_at=None):
+        self._clean = None
         self._id = _id
         self.video = video
         self.audio = audio
         self.created_at = created_at or datetime.now()
         self.updated_at = updated_at or datetime.now()
+        self.loaded_fields = None
+    
+    @classmethod
+    def projection(cls, fields):
+        """Proyección de MongoDB para los campos de respuesta pedidos"""
+        return mongo_projection(fields, cls.RESPONSE_FIELDS)
     
     def to_dict(self):
         """Convertir a diccionario para MongoDB"""
@@ -22,15 +66,32 @@ class Project:
         return data
     
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, fields=None):
         """Crear instancia desde diccionario de MongoDB"""
-        return cls(
+        project = cls(
             _id=data.get('_id'),
             video=data.get('video'),
             audio=data.get('audio'),
             created_at=data.get('created_at'),
             updated_at=data.get('updated_at')
         )
+        project.loaded_fields = fields
+        project.mark_clean()
+        return project
+    
+    @staticmethod
+    def document_to_response(data, fields=None):
+        """Documento de MongoDB -> diccionario de respuesta, sin crear un Project
+
+        Mismo resultado que from_dict(data, fields).to_response_dict().
+        """
+        return select_fields({
+            '_id': data.get('_id'),
+            'video': data.get('video'),
+            'audio': data.get('audio'),
+            'created_at': data.get('created_at') or datetime.now(),
+            'updated_at': data.get('updated_at') or datetime.now()
+        }, fields)
     
     @classmethod
     def find_by_id(cls, db, project_id):
@@ -49,22 +110,183 @@ class Project:
         projects_data = db.projects.find()
         return [cls.from_dict(data) for data in projects_data]
     
+    @classmethod
+    def _segment_selection(cls, fields, segment_fields):
+        """(consultar segmentos, campos de segmentos) según los campos pedidos del proyecto
+
+        Si fields no pide segments ni segments_count no se consultan los segmentos;
+        si solo pide segments_count basta con sus _id.
+        """
+        if fields is None:
+            return True, segment_fields
+        if not fields & set(cls.SEGMENT_FIELDS):
+            return False, None
+        if 'segments' not in fields:
+            return True, {'_id'}
+        return True, segment_fields
+    
+    @classmethod
+    def _load(cls, data, fields=None, as_response=False):
+        """Documento -> Project, o documento -> diccionario de respuesta (as_response)"""
+        if as_response:
+            return cls.document_to_response(data, fields)
+        return cls.from_dict(data, fields)
+    
+    @classmethod
+    def _attach_segments(cls, db, projects_data, fields=None, segment_fields=None, as_response=False):
+        """Cargar los proyectos y agregar a cada uno sus segmentos con una sola consulta
+
+        Con as_response se retornan diccionarios de respuesta en lugar de objetos.
+        """
+        from models.segment import Segment
+        
+        projects = [cls._load(data, fields, as_response) for data in projects_data]
+        with_segments, segment_fields = cls._segment_selection(fields, segment_fields)
+        if not with_segments:
+            return [(project, []) for project in projects]
+        project_ids = [data['_id'] for data in projects_data]
+        segments_by_project = Segment.find_by_projects(db, project_ids, segment_fields, as_response)
+        return [
+            (project, segments_by_project.get(project_id, []))
+            for project, project_id in zip(projects, project_ids)
+        ]
+    
+    @classmethod
+    def find_all_with_segments(cls, db, project_ids=None, fields=None, segment_fields=None, as_response=False):
+        """Obtener proyectos junto con sus segmentos en dos consultas (sin N+1)"""
+        query = {}
+        if project_ids is not None:
+            try:
+                query = {'_id': {'$in': [ObjectId(project_id) for project_id in project_ids]}}
+            except Exception:
+                return []
+        
+        projects_data = list(db.projects.find(query, cls.projection(fields)))
+        return cls._attach_segments(db, projects_data, fields, segment_fields, as_response)
+    
+    @classmethod
+    def find_page_with_segments(cls, db, limit, after=None, fields=None, segment_fields=None, as_response=False):
+        """Obtener una página de proyectos (cursor sobre _id) junto con sus segmentos"""
+        projects_data, next_cursor = find_page(db.projects, limit, after, projection=cls.projection(fields))
+        return cls._attach_segments(db, projects_data, fields, segment_fields, as_response), next_cursor
+    
+    @classmethod
+    def find_by_id_with_segments(cls, db, project_id, fields=None, segment_fields=None, as_response=False):
+        """Buscar proyecto por ID junto con sus segmentos (las dos consultas en paralelo)"""
+        from models.segment import Segment
+        
+        try:
+            project_object_id = ObjectId(project_id)
+        except Exception:
+            return None, []
+        
+        with_segments, segment_fields = cls._segment_selection(fields, segment_fields)
+        project_data, segments = run_parallel(
+            lambda: db.projects.find_one({'_id': project_object_id}, cls.projection(fields)),
+            lambda: Segment.find_by_project(
+                db, project_object_id, fields=segment_fields, as_response=as_response
+            ) if with_segments else []
+        )
+        if project_data is None:
+            return None, []
+        return cls._load(project_data, fields, as_response), segments
+    
+    @classmethod
+    def touch(cls, db, project_ids):
+        """Marcar proyectos como modificados (se llama en cada escritura de segmentos)"""
+        project_ids = [project_id for project_id in set(project_ids) if project_id]
+        if not project_ids:
+            return
+        # version/content_updated_at cambian con el proyecto y con sus segmentos (ETag/Last-Modified)
+        db.projects.update_many(
+            {'_id': {'$in': [ObjectId(project_id) for project_id in project_ids]}},
+            {'$inc': {'version': 1}, '$set': {'content_updated_at': datetime.utcnow()}}
+        )
+    
+    @classmethod
+    def touch_counters(cls, project_ids):
+        """Marcar que cambiaron vistas/likes de segmentos de los proyectos (sin escribir aún)
+
+        counters_version entra en el ETag junto con version, pero no invalida lo que
+        depende solo del contenido (índices de intervalos). Se escribe en el siguiente
+        lote de counter_versions, así los contadores del cuerpo pueden tardar hasta
+        PROJECT_COUNTERS_VERSION_INTERVAL segundos en verse.
+        """
+        for project_id in set(project_ids):
+            if project_id:
+                counter_versions.add(ObjectId(project_id), 'counters_version')
+    
+    @classmethod
+    def get_watermark(cls, db, project_id):
+        """Obtener (versión, versión de contadores, fecha de última modificación) de un proyecto, o None si no existe"""
+        try:
+            project_data = db.projects.find_one(
+                {'_id': ObjectId(project_id)},
+                {'version': 1, 'counters_version': 1, 'content_updated_at': 1}
+            )
+        except Exception:
+            return None
+        if not project_data:
+            return None
+        return (
+            project_data.get('version', 0),
+            project_data.get('counters_version', 0),
+            project_data.get('content_updated_at')
+        )
+    
+    @classmethod
+    def update_by_id(cls, db, project_id, fields):
+        """Actualizar campos de un proyecto en una sola llamada (find_one_and_update)"""
+        try:
+            project_object_id = ObjectId(project_id)
+        except Exception:
+            return None
+        
+        changes = {cls.FIELD_NAMES[name]: value for name, value in fields.items()}
+        changes['updated_at'] = datetime.now()
+        changes['content_updated_at'] = datetime.utcnow()
+        project_data = db.projects.find_one_and_update(
+            {'_id': project_object_id},
+            {'$set': changes, '$inc': {'version': 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if project_data:
+            return cls.from_dict(project_data)
+        return None
+    
+    @classmethod
+    def delete_by_id(cls, db, project_id):
+        """Eliminar un proyecto por ID en una sola llamada"""
+        try:
+            return db.projects.find_one_and_delete({'_id': ObjectId(project_id)}, projection={'_id': 1}) is not None
+        except Exception:
+            return False
+    
     def save(self, db):
         """Guardar proyecto en la base de datos"""
         if self._id:
-            # Actualizar
+            # Actualizar solo los campos modificados
+            changes = self.changed_fields() if self.is_tracked else self.to_dict()
+            if not changes:
+                return False
             self.updated_at = datetime.now()
+            changes['updated_at'] = self.updated_at
+            changes['content_updated_at'] = datetime.utcnow()
             result = db.projects.update_one(
                 {'_id': self._id},
-                {'$set': self.to_dict()}
+                {'$set': changes, '$inc': {'version': 1}}
             )
+            self.mark_clean()
             return result.modified_count > 0
         else:
             # Crear nuevo
             self.created_at = datetime.now()
             self.updated_at = datetime.now()
-            result = db.projects.insert_one(self.to_dict())
+            result = db.projects.insert_one(dict(
+                self.to_dict(), version=1, content_updated_at=datetime.utcnow()
+            ))
             self._id = result.inserted_id
+            self.mark_clean()
             return True
     
     def delete(self, db):
@@ -74,12 +296,12 @@ class Project:
             return result.deleted_count > 0
         return False
     
-    def to_response_dict(self):
-        """Convertir a diccionario para respuesta"""
-        return {
-            '_id': str(self._id),
+    def to_response_dict(self, fields=None):
+        """Convertir a diccionario para respuesta (solo los campos pedidos, si se indican)"""
+        return select_fields({
+            '_id': self._id,
             'video': self.video,
             'audio': self.audio,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        } 
\ No newline at end of file
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }, fields if fields is not None else self.loaded_fields) 
\ No newline at end of file
@@ -1,10 +1,99 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+import os
+import time
+from config.database import get_db
+from config.logging_config import get_logger
+from utils.counter_buffer import CounterBuffer
+from models.project import Project
+from models.tracking import DirtyTracking
+from utils.pagination import find_page
+from utils.fields import mongo_projection, select_fields
+from utils.cache import TTLCache
+from utils.interval_index import IntervalIndex
 
-class Segment:
+logger = get_logger(__name__)
+
+def _touch_counter_projects(segment_ids):
+    """Cambiar la versión de contadores de los proyectos de segmentos ya escritos"""
+    db = get_db()
+    Project.touch_counters(db.segments.distinct('projectid', {'_id': {'$in': segment_ids}}))
+
+# Escritura diferida de vistas/likes: se agregan en memoria y se escriben en lote
+COUNTERS_WRITE_BEHIND = os.environ.get('SEGMENT_COUNTERS_WRITE_BEHIND', 'false').lower() == 'true'
+segment_counters = CounterBuffer(
+    'segments',
+    get_db,
+    flush_interval=float(os.environ.get('SEGMENT_COUNTERS_FLUSH_INTERVAL', 1.0)),
+    max_pending=int(os.environ.get('SEGMENT_COUNTERS_MAX_PENDING', 1000)),
+    on_flush=_touch_counter_projects,
+    base_cache_size=int(os.environ.get('SEGMENT_COUNTERS_CACHE_SIZE', 10000)),
+    base_cache_ttl=int(os.environ.get('SEGMENT_COUNTERS_CACHE_TTL', 60))
+)
+
+# Índices de intervalos por proyecto para consultas por instante (ver Segment.interval_index)
+_interval_indexes = TTLCache(
+    maxsize=int(os.environ.get('SEGMENT_INTERVAL_CACHE_SIZE', 64)),
+    ttl=int(os.environ.get('SEGMENT_INTERVAL_CACHE_TTL', 300))
+)
+# Cada cuánto se vuelve a comprobar la versión de un proyecto con índice en caché
+INTERVAL_RECHECK_SECONDS = float(os.environ.get('SEGMENT_INTERVAL_RECHECK', 1.0))
+
+def _touch_projects(db, project_ids):
+    """Marcar proyectos como modificados y descartar sus índices de intervalos"""
+    project_ids = [project_id for project_id in project_ids if project_id]
+    Project.touch(db, project_ids)
+    for project_id in project_ids:
+        _interval_indexes.delete(str(project_id))
+
+def get_interval_cache_stats():
+    """Métricas de la caché de índices de intervalos"""
+    return _interval_indexes.stats()
+
+class Segment(DirtyTracking):
+    __slots__ = (
+        '_id', 'start_time', 'end_time', 'duration', 'views', 'likes', 'prosody', 'prosody2',
+        'description', 'descriptions_prosody', 'project_id', 'created_at', 'updated_at', 'loaded_fields'
+    )
+    
+    # Nombre del atributo -> nombre del campo en MongoDB
+    FIELD_NAMES = {
+        'start_time': 'startTime',
+        'end_time': 'endTime',
+        'duration': 'duration',
+        'views': 'views',
+        'likes': 'likes',
+        'prosody': 'prosody',
+        'prosody2': 'prosody2',
+        'description': 'description',
+        'descriptions_prosody': 'descriptions_prosody',
+        'project_id': 'projectid',
+        'created_at': 'createdAt'
+    }
+    
+    # Campo de la respuesta -> campos de MongoDB que necesita (?fields=)
+    RESPONSE_FIELDS = {
+        '_id': ('_id',),
+        'start_time': ('startTime',),
+        'end_time': ('endTime',),
+        'duration': ('startTime', 'endTime'),
+        'views': ('views',),
+        'likes': ('likes',),
+        'prosody': ('prosody',),
+        'prosody2': ('prosody2',),
+        'description': ('description',),
+        'descriptions_prosody': ('descriptions_prosody',),
+        'project_id': ('projectid',),
+        'created_at': ('createdAt',),
+        'updated_at': ('updatedAt',)
+    }
+    
     def __init__(self, start_time, end_time, project_id, prosody=None, prosody2=None, 
                  description=None, descriptions_prosody=None, views=0, likes=0, 
                  _id=None, created_at=None, updated_at=None):
+        self._clean = None
         self._id = _id
         self.start_time = start_time or 0
         self.end_time = end_time or 0
@@ -18,6 +107,12 @@ class Segment:
         self.project_id = project_id
         self.created_at = created_at or datetime.now()
         self.updated_at = updated_at or datetime.now()
+        self.loaded_fields = None
+    
+    @classmethod
+    def projection(cls, fields):
+        """Proyección de MongoDB para los campos de respuesta pedidos"""
+        return mongo_projection(fields, cls.RESPONSE_FIELDS)
     
     def to_dict(self):
         """Convertir a diccionario para MongoDB"""
@@ -40,9 +135,12 @@ class Segment:
         return data
     
     @classmethod
-    def from_dict(cls, data):
-        """Crear instancia desde diccionario de MongoDB"""
-        return cls(
+    def from_dict(cls, data, fields=None):
+        """Crear instancia desde diccionario de MongoDB
+
+        fields: campos de respuesta cargados con proyección; to_response_dict solo incluye esos.
+        """
+        segment = cls(
             _id=data.get('_id'),
             start_time=data.get('startTime'),  # ← camelCase
             end_time=data.get('endTime'),      # ← camelCase
@@ -56,55 +154,424 @@ class Segment:
             created_at=data.get('createdAt'),  # ← camelCase
             updated_at=data.get('updatedAt')   # ← camelCase
         )
+        segment.loaded_fields = fields
+        segment.mark_clean()
+        return segment
+    
+    @staticmethod
+    def document_to_response(data, fields=None):
+        """Documento de MongoDB -> diccionario de respuesta, sin crear un Segment
+
+        Mismo resultado que from_dict(data, fields).to_response_dict(); se usa en los
+        listados, donde crear miles de objetos intermedios no aporta nada.
+        """
+        start_time = data.get('startTime') or 0
+        end_time = data.get('endTime') or 0
+        return select_fields({
+            '_id': data.get('_id'),
+            'start_time': start_time,
+            'end_time': end_time,
+            'duration': (end_time - start_time) if end_time and start_time else 0,
+            'views': data.get('views') or 0,
+            'likes': data.get('likes') or 0,
+            'prosody': data.get('prosody'),
+            'prosody2': data.get('prosody2'),
+            'description': data.get('description'),
+            'descriptions_prosody': data.get('descriptions_prosody') or [],
+            'project_id': data.get('projectid') or None,
+            'created_at': data.get('createdAt') or datetime.now(),
+            'updated_at': data.get('updatedAt') or datetime.now()
+        }, fields)
+    
+    @classmethod
+    def _loader(cls, fields=None, as_response=False):
+        """Función documento -> Segment, o documento -> diccionario de respuesta (as_response)"""
+        if as_response:
+            return lambda data: cls.document_to_response(data, fields)
+        return lambda data: cls.from_dict(data, fields)
     
     @classmethod
-    def find_by_id(cls, db, segment_id):
+    def find_by_id(cls, db, segment_id, fields=None):
         """Buscar segmento por ID"""
         try:
-            segment_data = db.segments.find_one({'_id': ObjectId(segment_id)})
+            segment_data = db.segments.find_one({'_id': ObjectId(segment_id)}, cls.projection(fields))
             if segment_data:
-                return cls.from_dict(segment_data)
+                return cls.from_dict(segment_data, fields)
         except:
             pass
         return None
     
+    @staticmethod
+    def project_query(project_id, start=None, end=None):
+        """Filtro de segmentos de un proyecto, opcionalmente los que se solapan con [start, end]
+
+        Usa el índice (projectid, startTime, endTime): startTime acota el recorrido
+        y endTime se filtra sobre las claves del índice sin leer documentos.
+        """
+        query = {'projectid': ObjectId(project_id)}
+        if end is not None:
+            query['startTime'] = {'$lte': end}
+        if start is not None:
+            query['endTime'] = {'$gte': start}
+        return query
+    
     @classmethod
-    def find_by_project(cls, db, project_id):
-        """Buscar segmentos por proyecto"""
-        try:
-            # Validar que project_id sea válido
-            if not project_id:
-                print(f'❌ project_id es None o vacío')
-                return []
-            
-            # Convertir a ObjectId
-            project_object_id = ObjectId(project_id)
-            segments_data = db.segments.find({'projectid': project_object_id})  # ← usar 'projectid'
-            segments = [cls.from_dict(data) for data in segments_data]
-            print(f'✅ Encontrados {len(segments)} segmentos para proyecto {project_id}')
-            return segments
-        except Exception as e:
-            print(f'❌ Error al buscar segmentos por proyecto {project_id}: {str(e)}')
+    def find_by_project(cls, db, project_id, start=None, end=None, fields=None, as_response=False):
+        """Buscar segmentos por proyecto (opcionalmente solo los que se solapan con [start, end])
+
+        Los errores de la base de datos se propagan: los resultados se guardan en
+        caché y con ETag, y una lista vacía por error quedaría servida como válida.
+        """
+        # Validar que project_id sea válido
+        if not project_id:
+            logger.warning('❌ project_id es None o vacío')
             return []
+        
+        query = cls.project_query(project_id, start, end)  # ← usar 'projectid'
+        segments_data = db.segments.find(query, cls.projection(fields))
+        if start is not None or end is not None:
+            segments_data = segments_data.sort('startTime', 1)
+        load = cls._loader(fields, as_response)
+        segments = [load(data) for data in segments_data]
+        logger.info('✅ Encontrados %s segmentos para proyecto %s', len(segments), project_id)
+        return segments
     
     @classmethod
-    def find_all(cls, db):
+    def iter_by_project(cls, db, project_id, start=None, end=None, fields=None, as_response=False):
+        """Iterar segmentos de un proyecto sin cargarlos todos en memoria"""
+        load = cls._loader(fields, as_response)
+        cursor = db.segments.find(cls.project_query(project_id, start, end), cls.projection(fields))
+        if start is not None or end is not None:
+            cursor = cursor.sort('startTime', 1)
+        for data in cursor:
+            yield load(data)
+    
+    @classmethod
+    def interval_index(cls, db, project_id):
+        """Índice de intervalos de los segmentos de un proyecto, o None si el proyecto no existe
+
+        El índice se guarda con la versión del proyecto. Las escrituras de este proceso lo
+        descartan al momento (_touch_projects); las de otros procesos se detectan volviendo a
+        leer la versión como mucho cada SEGMENT_INTERVAL_RECHECK segundos, no en cada
+        consulta, así que pueden tardar ese tiempo en verse. Vistas/likes no cambian la
+        versión: en el índice se actualizan al reconstruirlo o al vencer su TTL. Si la
+        lectura falla la excepción se propaga y no se guarda ningún índice.
+        """
+        key = str(project_id)
+        cached = _interval_indexes.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[2] < INTERVAL_RECHECK_SECONDS:
+            return cached[1]
+        
+        watermark = Project.get_watermark(db, project_id)
+        if watermark is None:
+            _interval_indexes.delete(key)
+            return None
+        version = watermark[0]
+        if cached is not None and cached[0] == version:
+            _interval_indexes.set(key, (version, cached[1], now))
+            return cached[1]
+        
+        index = IntervalIndex(
+            cls.find_by_project(db, project_id),
+            lambda segment: segment.start_time,
+            lambda segment: segment.end_time
+        )
+        _interval_indexes.set(key, (version, index, now))
+        logger.debug('🗂️ Índice de intervalos construido: %s (%s segmentos)', project_id, len(index))
+        return index
+    
+    @classmethod
+    def find_by_projects(cls, db, project_ids, fields=None, as_response=False):
+        """Buscar segmentos de varios proyectos en una sola consulta, agrupados por proyecto"""
+        grouped = {project_id: [] for project_id in project_ids}
+        if not project_ids:
+            return grouped
+        projection = cls.projection(fields)
+        if projection is not None:
+            # projectid hace falta para agrupar aunque no se haya pedido
+            projection['projectid'] = 1
+        segments_data = db.segments.find({'projectid': {'$in': list(project_ids)}}, projection)
+        load = cls._loader(fields, as_response)
+        for data in segments_data:
+            grouped.setdefault(data.get('projectid'), []).append(load(data))
+        return grouped
+    
+    @classmethod
+    def find_all(cls, db, fields=None, as_response=False):
         """Obtener todos los segmentos"""
-        segments_data = db.segments.find()
-        return [cls.from_dict(data) for data in segments_data]
+        segments_data = db.segments.find({}, cls.projection(fields))
+        load = cls._loader(fields, as_response)
+        return [load(data) for data in segments_data]
+    
+    @classmethod
+    def find_page(cls, db, limit, after=None, fields=None, as_response=False):
+        """Obtener una página de segmentos (paginación por cursor sobre _id)"""
+        segments_data, next_cursor = find_page(db.segments, limit, after, projection=cls.projection(fields))
+        load = cls._loader(fields, as_response)
+        return [load(data) for data in segments_data], next_cursor
+    
+    @classmethod
+    def insert_many(cls, db, segments, ordered=True, chunk_size=500):
+        """Insertar segmentos en lotes con insert_many
+
+        Retorna una lista con el error de cada segmento (None si se insertó).
+        En modo ordenado, el primer error detiene la inserción del resto.
+        """
+        errors = [None] * len(segments)
+        for chunk_start in range(0, len(segments), chunk_size):
+            chunk = segments[chunk_start:chunk_start + chunk_size]
+            now = datetime.now()
+            for segment in chunk:
+                segment.duration = segment.end_time - segment.start_time
+                segment.created_at = now
+                segment.updated_at = now
+            documents = [segment.to_dict() for segment in chunk]
+            
+            try:
+                db.segments.insert_many(documents, ordered=ordered)
+                failed = {}
+            except BulkWriteError as error:
+                failed = {
+                    write_error['index']: write_error.get('errmsg', 'Error al insertar')
+                    for write_error in error.details.get('writeErrors', [])
+                }
+            
+            stop_at = min(failed) if (ordered and failed) else None
+            for index, (segment, document) in enumerate(zip(chunk, documents)):
+                if index in failed:
+                    errors[chunk_start + index] = failed[index]
+                elif stop_at is not None and index > stop_at:
+                    errors[chunk_start + index] = 'No insertado: error previo en modo ordenado'
+                else:
+                    segment._id = document['_id']
+            
+            if stop_at is not None:
+                for index in range(chunk_start + len(chunk), len(segments)):
+                    errors[index] = 'No insertado: error previo en modo ordenado'
+                break
+        
+        _touch_projects(db, [segment.project_id for segment in segments if segment._id])
+        return errors
+    
+    @classmethod
+    def find_times(cls, db, segment_ids):
+        """Obtener (startTime, endTime, projectid) de varios segmentos en una sola consulta"""
+        segments_data = db.segments.find(
+            {'_id': {'$in': list(segment_ids)}},
+            {'startTime': 1, 'endTime': 1, 'projectid': 1}
+        )
+        return {
+            data['_id']: (data.get('startTime'), data.get('endTime'), data.get('projectid'))
+            for data in segments_data
+        }
+    
+    @classmethod
+    def bulk_update(cls, db, updates, delete_ids, ordered=True, use_transaction=False, project_ids=()):
+        """Aplicar actualizaciones parciales y eliminaciones en un solo bulk_write
+
+        `updates` es una lista de (segment_id, (startTime, endTime) actuales, campos).
+        El filtro incluye los tiempos actuales para no pisar cambios concurrentes.
+        `project_ids` son los proyectos afectados, para actualizar su versión.
+        Retorna los contadores, en `conflicts` los IDs cuyas actualizaciones no coincidieron
+        y en `rolled_back` si se revirtió el lote: con transacción, un conflicto revierte todo.
+        """
+        now = datetime.now()
+        operations = []
+        for segment_id, (current_start, current_end), fields in updates:
+            changes = {cls.FIELD_NAMES[name]: value for name, value in fields.items()}
+            start_time = changes.get('startTime', current_start)
+            end_time = changes.get('endTime', current_end)
+            if 'startTime' in changes or 'endTime' in changes:
+                changes['duration'] = end_time - start_time
+            changes['updatedAt'] = now
+            operations.append(UpdateOne(
+                {'_id': segment_id, 'startTime': current_start, 'endTime': current_end},
+                {'$set': changes}
+            ))
+        operations.extend(DeleteOne({'_id': segment_id}) for segment_id in delete_ids)
+        
+        if not operations:
+            return {'matched': 0, 'modified': 0, 'deleted': 0, 'conflicts': [], 'rolled_back': False}
+        
+        def apply(session=None):
+            result = db.segments.bulk_write(operations, ordered=ordered, session=session)
+            # bulk_write solo da totales: los segmentos con este updatedAt son los que se actualizaron
+            conflicts = []
+            if result.matched_count < len(updates):
+                update_ids = [segment_id for segment_id, _, _ in updates]
+                applied = {
+                    data['_id'] for data in db.segments.find(
+                        {'_id': {'$in': update_ids}, 'updatedAt': now}, {'_id': 1}, session=session
+                    )
+                }
+                conflicts = [segment_id for segment_id in update_ids if segment_id not in applied]
+                if session is not None:
+                    # with_transaction no confirma una transacción abortada en el callback
+                    session.abort_transaction()
+            return result, conflicts
+        
+        if use_transaction:
+            with db.client.start_session() as session:
+                result, conflicts = session.with_transaction(apply)
+            if conflicts:
+                return {'matched': 0, 'modified': 0, 'deleted': 0, 'conflicts': conflicts, 'rolled_back': True}
+        else:
+            result, conflicts = apply()
+        
+        for segment_id in delete_ids:
+            segment_counters.discard(segment_id)
+        _touch_projects(db, project_ids)
+        return {
+            'matched': result.matched_count,
+            'modified': result.modified_count,
+            'deleted': result.deleted_count,
+            'conflicts': conflicts,
+            'rolled_back': False
+        }
+    
+    @classmethod
+    def set_prosody_field(cls, db, segment_id, user_id, field_name, field_value, timestamp):
+        """Guardar un campo de descriptions_prosody de un usuario sin reescribir el arreglo
+
+        Actualiza la entrada del usuario con arrayFilters o, si no existe, la agrega con $push
+        (o crea el arreglo si el campo falta o es null). Retorna el segmento actualizado, o
+        None si no existe.
+        """
+        try:
+            segment_object_id = ObjectId(segment_id)
+        except Exception:
+            return None
+        
+        now = datetime.now()
+        new_entry = {
+            'user_id': user_id,
+            field_name: field_value,
+            'timestamps': {field_name: timestamp}
+        }
+        attempts = (
+            # La entrada del usuario ya existe
+            (
+                {'_id': segment_object_id, 'descriptions_prosody.user_id': user_id},
+                {'$set': {
+                    f'descriptions_prosody.$[entry].{field_name}': field_value,
+                    f'descriptions_prosody.$[entry].timestamps.{field_name}': timestamp,
+                    'updatedAt': now
+                }},
+                [{'entry.user_id': user_id}]
+            ),
+            # Arreglo sin entrada del usuario
+            (
+                {
+                    '_id': segment_object_id,
+                    'descriptions_prosody': {'$type': 'array'},
+                    'descriptions_prosody.user_id': {'$ne': user_id}
+                },
+                {'$push': {'descriptions_prosody': new_entry}, '$set': {'updatedAt': now}},
+                None
+            ),
+            # Campo ausente o null ($push fallaría)
+            (
+                {'_id': segment_object_id, 'descriptions_prosody': {'$not': {'$type': 'array'}}},
+                {'$set': {'descriptions_prosody': [new_entry], 'updatedAt': now}},
+                None
+            )
+        )
+        
+        # Dos vueltas: si otro cliente crea la entrada o el arreglo entre intentos, se reintenta
+        for _ in range(2):
+            for query, update, array_filters in attempts:
+                segment_data = db.segments.find_one_and_update(
+                    query, update, array_filters=array_filters, return_document=ReturnDocument.AFTER
+                )
+                if segment_data is not None:
+                    _touch_projects(db, [segment_data.get('projectid')])
+                    return cls.from_dict(segment_data)
+            if db.segments.count_documents({'_id': segment_object_id}, limit=1) == 0:
+                return None
+        return None
+    
+    @classmethod
+    def update_by_id(cls, db, segment_id, fields):
+        """Actualizar campos de un segmento en una sola llamada (find_one_and_update)
+
+        La condición startTime < endTime del resultado va en el filtro y la duración
+        se recalcula en el servidor. Retorna el segmento actualizado, o None si no
+        existe o si el resultado no cumpliría la condición.
+        """
+        try:
+            segment_object_id = ObjectId(segment_id)
+        except Exception:
+            return None
+        
+        query = {'_id': segment_object_id}
+        start_time = fields.get('start_time')
+        end_time = fields.get('end_time')
+        if start_time is not None and end_time is None:
+            query['endTime'] = {'$gt': start_time}
+        elif end_time is not None and start_time is None:
+            query['startTime'] = {'$lt': end_time}
+        
+        changes = {cls.FIELD_NAMES[name]: {'$literal': value} for name, value in fields.items()}
+        changes['updatedAt'] = {'$literal': datetime.now()}
+        pipeline = [{'$set': changes}]
+        if start_time is not None or end_time is not None:
+            pipeline.append({'$set': {'duration': {'$subtract': ['$endTime', '$startTime']}}})
+        
+        segment_data = db.segments.find_one_and_update(
+            query,
+            pipeline,
+            return_document=ReturnDocument.AFTER
+        )
+        if segment_data:
+            _touch_projects(db, [segment_data.get('projectid')])
+            return cls.from_dict(segment_data)
+        return None
+    
+    @classmethod
+    def exists(cls, db, segment_id):
+        """Verificar si un segmento existe"""
+        try:
+            return db.segments.count_documents({'_id': ObjectId(segment_id)}, limit=1) > 0
+        except Exception:
+            return False
+    
+    @classmethod
+    def delete_by_id(cls, db, segment_id):
+        """Eliminar un segmento por ID en una sola llamada
+
+        Retorna el projectid del segmento eliminado, o None si no existía.
+        """
+        try:
+            segment_data = db.segments.find_one_and_delete({'_id': ObjectId(segment_id)}, projection={'projectid': 1})
+        except Exception:
+            return None
+        if segment_data is None:
+            return None
+        segment_counters.discard(segment_data['_id'])
+        _touch_projects(db, [segment_data.get('projectid')])
+        return segment_data.get('projectid')
     
     def save(self, db):
         """Guardar segmento en la base de datos"""
-        # Recalcular duración
-        self.duration = self.end_time - self.start_time
+        # Recalcular duración (solo queda marcada si cambió)
+        duration = self.end_time - self.start_time
+        if duration != self.duration:
+            self.duration = duration
         
         if self._id:
-            # Actualizar
+            # Actualizar solo los campos modificados
+            changes = self.changed_fields() if self.is_tracked else self.to_dict()
+            if not changes:
+                return False
             self.updated_at = datetime.now()
+            changes['updatedAt'] = self.updated_at
             result = db.segments.update_one(
                 {'_id': self._id},
-                {'$set': self.to_dict()}
+                {'$set': changes}
             )
+            self.mark_clean()
+            _touch_projects(db, [self.project_id])
             return result.modified_count > 0
         else:
             # Crear nuevo
@@ -112,43 +579,77 @@ class Segment:
             self.updated_at = datetime.now()
             result = db.segments.insert_one(self.to_dict())
             self._id = result.inserted_id
+            self.mark_clean()
+            _touch_projects(db, [self.project_id])
             return True
     
     def delete(self, db):
         """Eliminar segmento de la base de datos"""
         if self._id:
             result = db.segments.delete_one({'_id': self._id})
+            segment_counters.discard(self._id)
+            _touch_projects(db, [self.project_id])
             return result.deleted_count > 0
         return False
     
+    @classmethod
+    def increment_counter(cls, db, segment_id, field, amount=1):
+        """Incrementar un contador en un solo viaje a la base de datos
+
+        Retorna el valor después del incremento, o None si el segmento no existe.
+        La versión de contadores del proyecto (ETag) se escribe en lote: sin escritura
+        diferida se marca aquí, con ella después de escribir los incrementos.
+        """
+        try:
+            segment_object_id = ObjectId(segment_id)
+        except Exception:
+            return None
+        
+        if COUNTERS_WRITE_BEHIND:
+            # Valor aproximado: contadores en caché (se leen una vez por segmento) + pendientes
+            if segment_counters.get_base(segment_object_id) is None:
+                segment_data = db.segments.find_one({'_id': segment_object_id}, {'views': 1, 'likes': 1})
+                if not segment_data:
+                    return None
+                segment_counters.set_base(segment_object_id, {
+                    'views': segment_data.get('views') or 0,
+                    'likes': segment_data.get('likes') or 0
+                })
+            return segment_counters.add(segment_object_id, field, amount)
+        
+        segment_data = db.segments.find_one_and_update(
+            {'_id': segment_object_id},
+            {'$inc': {field: amount}},
+            projection={field: 1, 'projectid': 1, '_id': 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if not segment_data:
+            return None
+        Project.touch_counters([segment_data.get('projectid')])
+        return segment_data.get(field, 0)
+    
     def increment_views(self, db):
         """Incrementar contador de vistas"""
         if self._id:
-            result = db.segments.update_one(
-                {'_id': self._id},
-                {'$inc': {'views': 1}}
-            )
-            if result.modified_count > 0:
-                self.views += 1
-            return result.modified_count > 0
+            views = self.increment_counter(db, self._id, 'views')
+            if views is not None:
+                self.set_clean('views', views)
+                return True
         return False
     
     def increment_likes(self, db):
         """Incrementar contador de likes"""
         if self._id:
-            result = db.segments.update_one(
-                {'_id': self._id},
-                {'$inc': {'likes': 1}}
-            )
-            if result.modified_count > 0:
-                self.likes += 1
-            return result.modified_count > 0
+            likes = self.increment_counter(db, self._id, 'likes')
+            if likes is not None:
+                self.set_clean('likes', likes)
+                return True
         return False
     
-    def to_response_dict(self):
-        """Convertir a diccionario para respuesta"""
-        return {
-            '_id': str(self._id) if self._id else None,
+    def to_response_dict(self, fields=None):
+        """Convertir a diccionario para respuesta (solo los campos pedidos, si se indican)"""
+        return select_fields({
+            '_id': self._id,
             'start_time': self.start_time,
             'end_time': self.end_time,
             'duration': self.duration,
@@ -158,7 +659,7 @@ class Segment:
             'prosody2': self.prosody2,
             'description': self.description,
             'descriptions_prosody': self.descriptions_prosody,
-            'project_id': str(self.project_id) if self.project_id else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        } 
\ No newline at end of file
+            'project_id': self.project_id or None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }, fields if fields is not None else self.loaded_fields)
\ No newline at end of file
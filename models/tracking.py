@@ -0,0 +1,58 @@
+from operator import attrgetter
+
+class DirtyTracking:
+    """Registrar qué atributos cambiaron desde que el objeto se cargó o se guardó
+
+    Cada modelo define FIELD_NAMES (atributo -> campo en MongoDB). Los objetos
+    creados con from_dict o ya guardados guardan una copia de sus valores y los
+    cambios se calculan comparando con ella; el resto (_clean es None) se guarda
+    completo como antes. Las listas o diccionarios modificados en sitio deben
+    reasignarse (con un objeto nuevo) para quedar marcados.
+    No se intercepta __setattr__: con __slots__ las asignaciones siguen siendo
+    directas y construir un objeto no paga por el registro de cambios.
+    """
+
+    __slots__ = ('_clean',)
+
+    FIELD_NAMES = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = tuple(cls.FIELD_NAMES)
+        getter = attrgetter(*names)
+        cls._tracked_values = (lambda obj: (getter(obj),)) if len(names) == 1 else getter
+
+    def mark_clean(self):
+        """Empezar a registrar cambios desde el estado actual"""
+        self._clean = self._tracked_values(self)
+
+    def set_clean(self, name, value):
+        """Asignar un atributo que ya coincide con la base de datos (sin marcarlo)"""
+        setattr(self, name, value)
+        if self._clean is not None and name in self.FIELD_NAMES:
+            clean = list(self._clean)
+            clean[tuple(self.FIELD_NAMES).index(name)] = value
+            self._clean = tuple(clean)
+
+    @property
+    def is_tracked(self):
+        return self._clean is not None
+
+    @property
+    def dirty_fields(self):
+        """Atributos modificados desde la última carga o guardado"""
+        if self._clean is None:
+            return set()
+        return {
+            name
+            for name, old, new in zip(self.FIELD_NAMES, self._clean, self._tracked_values(self))
+            if new is not old and new != old
+        }
+
+    def changed_fields(self):
+        """Campos modificados con sus nombres y valores de MongoDB"""
+        data = self.to_dict()
+        return {
+            self.FIELD_NAMES[name]: data[self.FIELD_NAMES[name]]
+            for name in self.dirty_fields
+        }
@@ -1,8 +1,23 @@
 from datetime import datetime
 from bson import ObjectId
+from models.tracking import DirtyTracking
+from config.logging_config import get_logger
 
-class User:
+logger = get_logger(__name__)
+
+class User(DirtyTracking):
+    __slots__ = ('_id', 'username', 'email', 'password', 'created_at', 'updated_at')
+    
+    # Nombre del atributo -> nombre del campo en MongoDB
+    FIELD_NAMES = {
+        'username': 'username',
+        'email': 'email',
+        'password': 'password',
+        'created_at': 'created_at'
+    }
+    
     def __init__(self, username, email, password, _id=None, created_at=None, updated_at=None):
+        self._clean = None
         self._id = _id
         self.username = username
         self.email = email
@@ -26,7 +41,7 @@ class User:
     @classmethod
     def from_dict(cls, data):
         """Crear instancia desde diccionario de MongoDB"""
-        return cls(
+        user = cls(
             _id=data.get('_id'),
             username=data.get('username'),
             email=data.get('email'),
@@ -34,13 +49,15 @@ class User:
             created_at=data.get('created_at'),
             updated_at=data.get('updated_at')
         )
+        user.mark_clean()
+        return user
     
     @classmethod
     def find_by_email(cls, db, email):
         """Buscar usuario por email"""
-        print(f'🔍 Ejecutando consulta: db.users.find_one({{"email": "{email}"}})')
+        logger.debug('🔍 Ejecutando consulta: db.users.find_one({"email": "%s"})', email)
         user_data = db.users.find_one({'email': email})
-        print(f'📊 Resultado de la consulta: {user_data}')
+        logger.debug('📊 Usuario encontrado: %s', user_data is not None)
         if user_data:
             return cls.from_dict(user_data)
         return None
@@ -56,12 +73,20 @@ class User:
     def save(self, db):
         """Guardar usuario en la base de datos"""
         if self._id:
-            # Actualizar
+            # Actualizar solo los campos modificados
+            changes = self.changed_fields() if self.is_tracked else self.to_dict()
+            if not changes:
+                return False
             self.updated_at = datetime.now()
+            changes['updated_at'] = self.updated_at
             result = db.users.update_one(
                 {'_id': self._id},
-                {'$set': self.to_dict()}
+                {'$set': changes}
             )
+            self.mark_clean()
+            # Los tokens en caché apuntan a la versión anterior del usuario
+            from config.jwt_config import invalidate_user_cache
+            invalidate_user_cache(user_id=self._id, email=self.email)
             return result.modified_count > 0
         else:
             # Crear nuevo
@@ -69,14 +94,15 @@ class User:
             self.updated_at = datetime.now()
             result = db.users.insert_one(self.to_dict())
             self._id = result.inserted_id
+            self.mark_clean()
             return True
     
     def to_response_dict(self):
         """Convertir a diccionario para respuesta (sin password)"""
         return {
-            '_id': str(self._id),
+            '_id': self._id,
             'username': self.username,
             'email': self.email,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         } 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from flask import Blueprint
 from controllers.segment_controller import (
-    get_segments, get_segment, get_segments_by_project,
-    create_segment, update_segment, delete_segment,
+    get_segments, get_segment, get_segments_by_project, get_segments_at_time,
+    create_segment, create_segments_bulk, update_segment, update_segments_bulk, delete_segment,
     increment_views, increment_likes, update_descriptions_prosody
 )
 
@@ -24,11 +24,26 @@ def get_segments_by_project_route(project_id):
     """Obtener segmentos por proyecto"""
     return get_segments_by_project(project_id)
 
+@segments_bp.route('/project/<project_id>/at', methods=['GET'])
+def get_segments_at_time_route(project_id):
+    """Obtener los segmentos activos de un proyecto en un instante"""
+    return get_segments_at_time(project_id)
+
 @segments_bp.route('/', methods=['POST'])
 def create_segment_route():
     """Crear un nuevo segmento"""
     return create_segment()
 
+@segments_bp.route('/bulk', methods=['POST'])
+def create_segments_bulk_route():
+    """Crear varios segmentos de un proyecto"""
+    return create_segments_bulk()
+
+@segments_bp.route('/bulk', methods=['PATCH'])
+def update_segments_bulk_route():
+    """Actualizar y/o eliminar varios segmentos"""
+    return update_segments_bulk()
+
 @segments_bp.route('/<segment_id>', methods=['PUT'])
 def update_segment_route(segment_id):
     """Actualizar un segmento"""
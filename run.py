@@ -6,7 +6,11 @@ Video Segments Player Backend
 
 import os
 import sys
-from index import app
+from dotenv import load_dotenv
+from server import serve
+
+# Cargar variables de entorno desde .env si existe
+load_dotenv()
 
 if __name__ == '__main__':
     print("🔍 DEBUG: Verificando variables de entorno...")
@@ -53,9 +57,8 @@ if __name__ == '__main__':
         sys.exit(1)
     
     try:
-        # En producción, no usar debug mode
-        debug_mode = os.environ.get('FLASK_ENV') == 'development'
-        app.run(host='0.0.0.0', port=port, debug=debug_mode)
+        # SERVER_MODE elige gunicorn, gevent o el servidor de desarrollo (sin debug en producción)
+        serve(port)
     except KeyboardInterrupt:
         print("\n👋 Servidor detenido por el usuario")
         sys.exit(0)
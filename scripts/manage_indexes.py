@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Script para crear y revisar los índices de MongoDB
+Uso: python scripts/manage_indexes.py [ensure|report]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from config.database import get_db
+from config.indexes import ensure_indexes, report_indexes
+
+def main():
+    """Ejecutar el comando indicado"""
+    load_dotenv()
+    command = sys.argv[1] if len(sys.argv) > 1 else 'report'
+
+    db = get_db()
+
+    if command == 'ensure':
+        print("🔧 Creando índices declarados...")
+        print("=" * 50)
+        results = ensure_indexes(db)
+        return all(result == 'ok' for result in results.values())
+
+    if command == 'report':
+        print("🔍 Revisando índices...")
+        print("=" * 50)
+        all_good = True
+        for collection, info in report_indexes(db).items():
+            print(f"📁 {collection}")
+            print(f"   ❌ Faltantes: {', '.join(info['missing']) or 'ninguno'}")
+            print(f"   ⚠️ No declarados: {', '.join(info['undeclared']) or 'ninguno'}")
+            print(f"   💤 Sin uso: {', '.join(info['unused']) or 'ninguno'}")
+            if info['missing']:
+                all_good = False
+        return all_good
+
+    print(f"❌ Comando desconocido: {command}")
+    print("📝 Uso: python scripts/manage_indexes.py [ensure|report]")
+    return False
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,39 @@
+"""
+Selección del servidor según SERVER_MODE
+- gunicorn: producción, varios procesos (gunicorn.conf.py)
+- gevent: un proceso cooperativo (gevent_server.py)
+- development: servidor de desarrollo de Flask
+Por defecto gunicorn, salvo con FLASK_ENV=development.
+"""
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_MODES = ('gunicorn', 'gevent', 'development')
+
+def get_server_mode():
+    """Modo de servidor desde variables de entorno"""
+    default = 'development' if os.environ.get('FLASK_ENV') == 'development' else 'gunicorn'
+    mode = os.environ.get('SERVER_MODE', default).lower()
+    if mode not in SERVER_MODES:
+        print(f"⚠️ SERVER_MODE inválido: {mode}, usando {default}")
+        mode = default
+    return mode
+
+def serve(port):
+    """Iniciar el servidor elegido (gunicorn y gevent reemplazan el proceso actual)"""
+    mode = get_server_mode()
+    print(f"🖥️ Servidor: {mode}")
+
+    if mode == 'gunicorn':
+        config = os.path.join(BASE_DIR, 'gunicorn.conf.py')
+        os.chdir(BASE_DIR)
+        os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '--config', config, 'index:app'])
+
+    if mode == 'gevent':
+        # Proceso nuevo: el monkey patch debe ocurrir antes de importar la app
+        os.execvp(sys.executable, [sys.executable, os.path.join(BASE_DIR, 'gevent_server.py')])
+
+    from index import app
+    app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_ENV') == 'development')
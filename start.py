@@ -39,8 +39,8 @@ if not jwt_secret:
 print("\n✅ Configuración correcta! Iniciando aplicación...")
 print("=" * 50)
 
-# Importar y ejecutar la aplicación
-from index import app
+# Iniciar el servidor elegido con SERVER_MODE (gunicorn por defecto en producción)
+from server import serve
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=int(port), debug=False) 
\ No newline at end of file
+    serve(int(port)) 
\ No newline at end of file
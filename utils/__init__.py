@@ -0,0 +1 @@
+# Este archivo hace que el directorio utils sea un paquete de Python
\ No newline at end of file
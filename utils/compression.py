@@ -0,0 +1,110 @@
+import gzip
+import os
+import threading
+
+# brotli y zstandard son opcionales: sin ellos solo se ofrece gzip
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_LEVELS = {
+    'gzip': int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6)),
+    'br': int(os.environ.get('COMPRESSION_BR_LEVEL', 5)),
+    'zstd': int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+}
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/plain', 'text/html'}
+
+def _gzip(data, level):
+    return gzip.compress(data, compresslevel=level)
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=level)
+
+def _zstd(data, level):
+    # ZstdCompressor no se comparte entre hilos: uno por llamada
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+# Codificaciones disponibles en orden de preferencia del servidor
+_ENCODERS = {'gzip': _gzip}
+if brotli is not None:
+    _ENCODERS['br'] = _brotli
+if zstandard is not None:
+    _ENCODERS['zstd'] = _zstd
+
+_preferred = os.environ.get('COMPRESSION_ALGORITHMS', 'zstd,br,gzip')
+AVAILABLE_ENCODINGS = [name.strip() for name in _preferred.split(',') if name.strip() in _ENCODERS]
+
+_stats_lock = threading.Lock()
+_stats = {'compressed': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+def negotiate_encoding(request):
+    """Mejor codificación aceptada por el cliente (Accept-Encoding), o None"""
+    if not COMPRESSION_ENABLED:
+        return None
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in AVAILABLE_ENCODINGS:
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def is_compressible(response):
+    """La respuesta es de un tipo que vale la pena comprimir y aún no está codificada"""
+    return (
+        COMPRESSION_ENABLED
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and 'Content-Encoding' not in response.headers
+    )
+
+def compress(data, encoding):
+    """Comprimir bytes con la codificación indicada"""
+    body = _ENCODERS[encoding](data, COMPRESSION_LEVELS[encoding])
+    with _stats_lock:
+        _stats['compressed'] += 1
+        _stats['bytes_in'] += len(data)
+        _stats['bytes_out'] += len(body)
+    return body
+
+def set_encoded_body(response, body, encoding):
+    """Usar un cuerpo ya comprimido (p. ej. desde una caché) en la respuesta"""
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def compress_response(response, request):
+    """Etapa after_request: comprimir respuestas completas mayores al umbral"""
+    if not is_compressible(response):
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.direct_passthrough or response.is_streamed or response.status_code < 200 \
+            or response.status_code in (204, 206, 304):
+        return response
+    encoding = negotiate_encoding(request)
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESSION_MIN_SIZE:
+        return response
+    return set_encoded_body(response, compress(data, encoding), encoding)
+
+def get_compression_stats():
+    """Métricas de compresión del proceso"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['encodings'] = AVAILABLE_ENCODINGS if COMPRESSION_ENABLED else []
+    stats['min_size'] = COMPRESSION_MIN_SIZE
+    stats['ratio'] = round(stats['bytes_out'] / stats['bytes_in'], 4) if stats['bytes_in'] else 0.0
+    return stats
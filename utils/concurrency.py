@@ -0,0 +1,36 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Pool compartido para consultas independientes de una misma petición.
+# Con gevent (ASYNC_MODE=gevent) los hilos del pool son greenlets.
+FANOUT_WORKERS = int(os.environ.get('QUERY_FANOUT_WORKERS', 8))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    """Pool del proceso actual (se crea de nuevo después de un fork)"""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is not None and _executor_pid == pid:
+        return _executor
+    with _executor_lock:
+        if _executor is None or _executor_pid != pid:
+            _executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='fanout')
+            _executor_pid = pid
+    return _executor
+
+def run_parallel(*calls):
+    """Ejecutar funciones sin argumentos en paralelo y retornar sus resultados en orden
+
+    La primera se ejecuta en el hilo actual; si alguna falla se propaga su excepción.
+    Con FANOUT_WORKERS=0 todo se ejecuta en secuencia.
+    """
+    if FANOUT_WORKERS <= 0 or len(calls) < 2:
+        return [call() for call in calls]
+    executor = _get_executor()
+    futures = [executor.submit(call) for call in calls[1:]]
+    first = calls[0]()
+    return [first] + [future.result() for future in futures]
@@ -0,0 +1,42 @@
+import hashlib
+from datetime import timezone
+from flask import current_app, request
+from utils.compression import negotiate_encoding
+
+def make_etag(kind, resource_id, version):
+    """ETag de una representación: tipo de respuesta + recurso + versión + parámetros + codificación"""
+    raw = (
+        f'{kind}:{resource_id}:{version}:{request.query_string.decode("latin-1")}'
+        f':{request.headers.get("Accept", "")}:{negotiate_encoding(request) or ""}'
+    )
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+def _as_utc(value):
+    """Las fechas de MongoDB llegan sin zona horaria pero están en UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+def is_not_modified(etag, last_modified=None):
+    """Evaluar If-None-Match / If-Modified-Since de la petición"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    last_modified = _as_utc(last_modified)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+def set_validators(response, etag, last_modified=None):
+    """Agregar ETag, Last-Modified y Cache-Control a una respuesta"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _as_utc(last_modified)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def not_modified_response(etag, last_modified=None):
+    """Respuesta 304 sin cuerpo con los validadores"""
+    response = current_app.response_class(status=304)
+    return set_validators(response, etag, last_modified)
@@ -0,0 +1,168 @@
+import atexit
+import os
+import threading
+from collections import defaultdict
+from pymongo import UpdateOne
+from config.logging_config import get_logger
+from utils.cache import TTLCache
+
+logger = get_logger(__name__)
+
+class CounterBuffer:
+    """Acumula incrementos ($inc) por documento y los escribe en un solo bulk_write
+
+    Se escribe cuando se alcanza max_pending documentos, cada flush_interval
+    segundos (hilo en segundo plano) y al apagar el proceso. on_flush(document_ids)
+    se llama después de cada escritura exitosa; set_fields() da campos que se
+    agregan con $set a cada documento escrito.
+
+    Los valores leídos de la base de datos se guardan por documento (set_base) y se
+    actualizan con cada escritura, así cada incremento no necesita otra lectura.
+    """
+
+    def __init__(self, collection_name, get_db, flush_interval=1.0, max_pending=1000, on_flush=None,
+                 set_fields=None, base_cache_size=10000, base_cache_ttl=60):
+        self.collection_name = collection_name
+        self.get_db = get_db
+        self.on_flush = on_flush
+        self.set_fields = set_fields
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.base_cache_size = base_cache_size
+        self.base_cache_ttl = base_cache_ttl
+        self._pending = defaultdict(lambda: defaultdict(int))
+        # El TTL acota cuánto tarda en verse lo que escriben otros procesos
+        self._base = TTLCache(maxsize=base_cache_size, ttl=base_cache_ttl)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        self._stop = threading.Event()
+        self.flushed_ops = 0
+        self.flush_errors = 0
+        atexit.register(self.shutdown)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        """El proceso hijo no hereda los pendientes del padre (los escribe el padre)"""
+        self._pending = defaultdict(lambda: defaultdict(int))
+        self._base = TTLCache(maxsize=self.base_cache_size, ttl=self.base_cache_ttl)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+
+    def _ensure_thread(self):
+        """Iniciar el hilo de escritura (de nuevo si el proceso viene de un fork)"""
+        pid = os.getpid()
+        if self._thread is not None and self._thread_pid == pid:
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != pid:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, name=f'{self.collection_name}-counters', daemon=True)
+                self._thread_pid = pid
+                self._thread.start()
+
+    def _run(self):
+        stop = self._stop
+        while not stop.wait(self.flush_interval):
+            self.flush()
+
+    def get_base(self, document_id):
+        """Valores guardados de un documento (dict), o None si no están en caché"""
+        with self._lock:
+            base = self._base.get(document_id)
+            return dict(base) if base is not None else None
+
+    def set_base(self, document_id, values):
+        """Guardar los valores leídos de la base de datos (sin los incrementos pendientes)"""
+        with self._lock:
+            self._base.set(document_id, dict(values))
+
+    def discard(self, document_id):
+        """Olvidar un documento (por ejemplo, al eliminarlo)"""
+        with self._lock:
+            self._base.delete(document_id)
+            self._pending.pop(document_id, None)
+
+    def add(self, document_id, field, amount=1):
+        """Registrar un incremento; retorna el valor guardado (0 si no hay) + el total pendiente"""
+        self._ensure_thread()
+        with self._lock:
+            self._pending[document_id][field] += amount
+            base = self._base.get(document_id)
+            value = ((base.get(field) or 0) if base is not None else 0) + self._pending[document_id][field]
+            should_flush = len(self._pending) >= self.max_pending
+        if should_flush:
+            self.flush()
+        return value
+
+    def pending(self, document_id, field):
+        """Incrementos aún no escritos de un campo"""
+        with self._lock:
+            counters = self._pending.get(document_id)
+            return counters.get(field, 0) if counters else 0
+
+    def flush(self):
+        """Escribir todos los incrementos pendientes en un solo bulk_write"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                pending = self._pending
+                self._pending = defaultdict(lambda: defaultdict(int))
+                # Los valores guardados pasan a incluir lo que se va a escribir
+                self._apply_to_base(pending, 1)
+
+            extra = {'$set': self.set_fields()} if self.set_fields else {}
+            operations = [
+                UpdateOne({'_id': document_id}, {'$inc': dict(counters), **extra})
+                for document_id, counters in pending.items()
+            ]
+            try:
+                self.get_db()[self.collection_name].bulk_write(operations, ordered=False)
+                self.flushed_ops += len(operations)
+            except Exception as error:
+                # Devolver los incrementos a la cola para el siguiente intento
+                self.flush_errors += 1
+                logger.error('💥 Error al escribir contadores de %s: %s', self.collection_name, error)
+                with self._lock:
+                    self._apply_to_base(pending, -1)
+                    for document_id, counters in pending.items():
+                        for field, amount in counters.items():
+                            self._pending[document_id][field] += amount
+                return 0
+
+            if self.on_flush is not None:
+                try:
+                    self.on_flush(list(pending))
+                except Exception as error:
+                    logger.error('💥 Error después de escribir contadores de %s: %s', self.collection_name, error)
+            return len(operations)
+
+    def _apply_to_base(self, pending, sign):
+        """Sumar (o restar) incrementos a los valores guardados; requiere self._lock"""
+        for document_id, counters in pending.items():
+            base = self._base.get(document_id)
+            if base is not None:
+                for field, amount in counters.items():
+                    base[field] = (base.get(field) or 0) + sign * amount
+
+    def shutdown(self):
+        """Detener el hilo y escribir lo pendiente"""
+        self._stop.set()
+        if self._thread_pid == os.getpid():
+            self.flush()
+
+    def stats(self):
+        """Métricas del buffer"""
+        with self._lock:
+            pending_documents = len(self._pending)
+        return {
+            'pending_documents': pending_documents,
+            'cached_documents': self._base.stats()['size'],
+            'flushed_operations': self.flushed_ops,
+            'flush_errors': self.flush_errors
+        }
@@ -0,0 +1,36 @@
+def parse_fields_arg(args, allowed, name='fields'):
+    """Leer ?fields=a,b de la petición (nombres de la respuesta, separados por coma)
+
+    Retorna el conjunto de campos pedidos, o None si la petición no pide proyección.
+    Lanza ValueError si algún campo no existe.
+    """
+    value = args.get(name)
+    if value is None:
+        return None
+    fields = {field.strip() for field in value.split(',') if field.strip()}
+    if not fields:
+        raise ValueError(f'El parámetro {name} no puede estar vacío')
+    unknown = fields - set(allowed)
+    if unknown:
+        raise ValueError(f'Campos no válidos en {name}: {", ".join(sorted(unknown))}')
+    return fields
+
+def mongo_projection(fields, response_fields):
+    """Proyección de MongoDB para los campos de respuesta pedidos (None = documento completo)
+
+    response_fields relaciona cada campo de la respuesta con los campos de MongoDB
+    que necesita; _id siempre se incluye.
+    """
+    if fields is None:
+        return None
+    projection = {'_id': 1}
+    for field in fields:
+        for mongo_field in response_fields.get(field, ()):
+            projection[mongo_field] = 1
+    return projection
+
+def select_fields(data, fields):
+    """Dejar en la respuesta solo los campos pedidos (y _id)"""
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key == '_id' or key in fields}
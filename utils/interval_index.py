@@ -0,0 +1,37 @@
+import bisect
+from itertools import accumulate
+
+class IntervalIndex:
+    """Intervalos ordenados por inicio para consultas por instante y por rango
+
+    Junto a los inicios se guarda el máximo acumulado de los fines (no decreciente),
+    así cada consulta hace dos búsquedas binarias (O(log n)) y solo recorre los
+    candidatos entre ambos límites; con intervalos sin solapamiento son exactamente
+    los resultados. Es de solo lectura: se reconstruye cuando cambian los datos.
+    """
+
+    def __init__(self, items, start_key, end_key):
+        items = [item for item in items if _is_number(start_key(item)) and _is_number(end_key(item))]
+        items.sort(key=start_key)
+        self.items = items
+        self._starts = [start_key(item) for item in items]
+        self._ends = [end_key(item) for item in items]
+        self._max_ends = list(accumulate(self._ends, max))
+
+    def __len__(self):
+        return len(self.items)
+
+    def at(self, t):
+        """Intervalos activos en el instante t (inicio <= t < fin)"""
+        hi = bisect.bisect_right(self._starts, t)
+        lo = bisect.bisect_right(self._max_ends, t, 0, hi)
+        return [self.items[i] for i in range(lo, hi) if self._ends[i] > t]
+
+    def overlapping(self, start, end):
+        """Intervalos que se solapan con [start, end] (inicio <= end y fin >= start)"""
+        hi = bisect.bisect_right(self._starts, end)
+        lo = bisect.bisect_left(self._max_ends, start, 0, hi)
+        return [self.items[i] for i in range(lo, hi) if self._ends[i] >= start]
+
+def _is_number(value):
+    return not isinstance(value, bool) and isinstance(value, (int, float))
@@ -0,0 +1,53 @@
+from bson import ObjectId
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+def parse_pagination_args(args):
+    """Leer ?limit=&after= de la petición (paginación por cursor sobre _id)
+
+    Retorna (limit, after) o (None, None) si la petición no pide paginación.
+    Lanza ValueError si los parámetros no son válidos.
+    """
+    limit = args.get('limit')
+    after = args.get('after')
+
+    if limit is None and after is None:
+        return None, None
+
+    if limit is None:
+        limit = DEFAULT_PAGE_LIMIT
+    else:
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError('El parámetro limit debe ser un número entero')
+        if limit < 1:
+            raise ValueError('El parámetro limit debe ser mayor a 0')
+        limit = min(limit, MAX_PAGE_LIMIT)
+
+    if after:
+        if not ObjectId.is_valid(after):
+            raise ValueError('El parámetro after no es un cursor válido')
+        after = ObjectId(after)
+    else:
+        after = None
+
+    return limit, after
+
+def find_page(collection, limit, after=None, query=None, projection=None):
+    """Obtener una página de documentos ordenados por _id
+
+    Retorna (documentos, next_cursor); next_cursor es None en la última página.
+    """
+    filters = dict(query or {})
+    if after is not None:
+        filters['_id'] = {'$gt': after}
+
+    documents = list(collection.find(filters, projection).sort('_id', 1).limit(limit + 1))
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = str(documents[-1]['_id'])
+    return documents, next_cursor
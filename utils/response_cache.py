@@ -0,0 +1,69 @@
+import os
+from flask import current_app, request
+from utils.cache import TTLCache
+from utils.compression import COMPRESSION_MIN_SIZE, is_compressible, negotiate_encoding, compress, set_encoded_body
+
+# Caché de respuestas serializadas por proyecto (detalle y segmentos)
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 30))
+_response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+def _cache_key(kind, project_id, version):
+    """La versión del proyecto es parte de la clave: otros procesos que escriben la cambian"""
+    return (
+        kind,
+        str(project_id),
+        version,
+        request.query_string,
+        request.headers.get('Accept', '')
+    )
+
+def _encode_from_entry(entry, response):
+    """Usar (o crear y guardar) el cuerpo comprimido de la entrada para la codificación del cliente
+
+    Así cada respuesta en caché se comprime una vez por codificación y no en cada petición.
+    """
+    if not is_compressible(response) or len(entry['body']) < COMPRESSION_MIN_SIZE:
+        return response
+    encoding = negotiate_encoding(request)
+    if encoding is None:
+        response.vary.add('Accept-Encoding')
+        return response
+    body = entry['encoded'].get(encoding)
+    if body is None:
+        body = compress(entry['body'], encoding)
+        entry['encoded'][encoding] = body
+    return set_encoded_body(response, body, encoding)
+
+def get_cached_response(kind, project_id, version):
+    """Obtener la respuesta en caché para esta versión del proyecto, o None"""
+    entry = _response_cache.get(_cache_key(kind, project_id, version))
+    if entry is None:
+        return None
+    response = current_app.response_class(entry['body'], status=entry['status'], mimetype=entry['mimetype'])
+    return _encode_from_entry(entry, response)
+
+def cache_response(kind, project_id, version, response):
+    """Guardar el cuerpo ya serializado de una respuesta exitosa (y su versión comprimida)"""
+    if response.status_code != 200 or response.is_streamed:
+        return response
+    entry = {
+        'project_id': str(project_id),
+        'body': response.get_data(),
+        'encoded': {},
+        'status': response.status_code,
+        'mimetype': response.mimetype
+    }
+    _response_cache.set(_cache_key(kind, project_id, version), entry)
+    return _encode_from_entry(entry, response)
+
+def invalidate_project(*project_ids):
+    """Eliminar las respuestas en caché de uno o varios proyectos"""
+    project_ids = {str(project_id) for project_id in project_ids if project_id}
+    if not project_ids:
+        return 0
+    return _response_cache.delete_where(lambda entry: entry['project_id'] in project_ids)
+
+def get_response_cache_stats():
+    """Métricas de la caché de respuestas"""
+    return _response_cache.stats()
@@ -0,0 +1,46 @@
+from flask import Response, current_app, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def wants_ndjson(request):
+    """La petición prefiere NDJSON (Accept: application/x-ndjson)"""
+    best = request.accept_mimetypes.best_match([NDJSON_MIMETYPE, 'application/json'])
+    return best == NDJSON_MIMETYPE and request.accept_mimetypes[NDJSON_MIMETYPE] > 0
+
+def wants_stream(request):
+    """La petición pide respuesta en streaming (?stream=true o NDJSON)"""
+    stream = request.args.get('stream', '').lower()
+    return stream in ('1', 'true', 'yes') or wants_ndjson(request)
+
+def stream_ndjson(items):
+    """Respuesta NDJSON: un objeto JSON por línea, codificado a medida que se itera"""
+    dumps = current_app.json.dumps
+
+    def generate():
+        for item in items:
+            yield dumps(item) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+def stream_json_list(envelope, data, key, items):
+    """Respuesta JSON en streaming con la forma {..., 'data': {..., key: [...], 'count': n}}
+
+    El arreglo `key` se codifica elemento por elemento y `count` se escribe al final,
+    así la memoria no crece con la cantidad de elementos.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        head = dumps(envelope)[:-1]
+        data_head = dumps(data)[:-1]
+        separator = ',' if data else ''
+        yield f'{head},"data":{data_head}{separator}"{key}":['
+        count = 0
+        for item in items:
+            if count:
+                yield ','
+            yield dumps(item)
+            count += 1
+        yield f'],"count":{count}}}}}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')